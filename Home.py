@@ -1,9 +1,13 @@
 import streamlit as st
 from utils.styles import apply_global_styles
+from utils.reference_data import warm_reference_data
 
 st.set_page_config(page_title="Avigilon UI", layout="wide")
 st.title("Avigilon API & Events Dashboard")
 apply_global_styles()
+# Start reference lookups in the background as soon as the app is opened, so pages find them cached.
+for api_url in {st.secrets.get("API_URL", "http://localhost:8000/api"), st.secrets.get("API_BASE", "http://localhost:8000/api")}:
+    warm_reference_data(api_url)
 
 st.markdown("""
 Welcome to the Avigilon API Explorer and Events Dashboard.
@@ -14,4 +18,6 @@ Welcome to the Avigilon API Explorer and Events Dashboard.
 - Endpoints: Interact with all Avigilon API endpoints.
 - Events: Visualize events from all servers.
 - Appearances: Visulaize appearance events from all servers.
+- Export & Replay: Export search results to chunk files and replay them to Duke-Central.
+- Diagnostics: Latency, throughput and error rates of Duke-Backend calls and page reruns.
 """)
@@ -0,0 +1,276 @@
+import argparse
+import io
+import itertools
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from PIL import Image
+
+# A local stand-in for Duke-Backend: serves the endpoints the pages use with synthetic data,
+# configurable result sizes and an artificial per-request latency.
+
+EVENT_TYPES = ['DEVICE_FACET_START', 'DEVICE_FACE_MATCH_START', 'DEVICE_MOTION_START', 'DEVICE_ANALYTICS_START']
+TIMELINE_START = datetime(2025, 6, 1, tzinfo=timezone.utc)
+TIMELINE_END = datetime(2025, 7, 1, tzinfo=timezone.utc)
+
+class MockConfig:
+    def __init__(self, servers=2, cameras=8, events=1000, appearances=100, snapshots=3,
+                 latency_ms=0, jpeg_size=(1920, 1080), video_bytes=5 * 1024 * 1024, ndjson_records=2000,
+                 error_rate=0):
+        self.servers = servers
+        self.cameras = cameras
+        self.events = events
+        self.appearances = appearances
+        self.snapshots = snapshots
+        self.latency_ms = latency_ms
+        self.jpeg_size = jpeg_size
+        self.video_bytes = video_bytes
+        self.ndjson_records = ndjson_records
+        self.error_rate = error_rate
+
+def api_time(value):
+    return value.strftime('%Y-%m-%dT%H:%M:%S.') + f"{value.microsecond // 1000:03d}Z"
+
+def parse_api_time(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+class MockBackend:
+    def __init__(self, config):
+        self.config = config
+        self.request_count = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._tokens = {}
+        self._token_ids = itertools.count(1)
+        self._jpeg = None
+
+    def count(self, size):
+        with self._lock:
+            self.request_count += 1
+            self.bytes_sent += size
+
+    def reset_counters(self):
+        with self._lock:
+            self.request_count = 0
+            self.bytes_sent = 0
+
+    def server_ids(self):
+        return [f"server-{i}" for i in range(self.config.servers)]
+
+    def camera_ids(self):
+        return [f"camera-{i}" for i in range(self.config.cameras)]
+
+    def event(self, server_id, index):
+        span = (TIMELINE_END - TIMELINE_START) / max(self.config.events, 1)
+        return {
+            'thisId': f"{server_id}-event-{index}",
+            'type': EVENT_TYPES[index % len(EVENT_TYPES)],
+            'timestamp': api_time(TIMELINE_START + span * index),
+            'cameraId': self.camera_ids()[index % self.config.cameras],
+            'originatingServerId': server_id,
+            'originatingEventId': index,
+            'objectId': index,
+            'faceRoi': {'left': 0.4, 'top': 0.2, 'right': 0.6, 'bottom': 0.5},
+            'recordTriggerParams': {'reason': 'ANALYTICS', 'sequence': index}
+        }
+
+    def events_in_range(self, server_id, from_time, to_time):
+        span = (TIMELINE_END - TIMELINE_START) / max(self.config.events, 1)
+        start = parse_api_time(from_time) if from_time else TIMELINE_START
+        end = parse_api_time(to_time) if to_time else TIMELINE_END
+        first = max(0, int((start - TIMELINE_START) / span))
+        last = min(self.config.events, int((end - TIMELINE_START) / span) + 1)
+        return [i for i in range(first, last) if start <= TIMELINE_START + span * i < end]
+
+    def page(self, kind, items, offset, limit, build):
+        chunk = items[offset:offset + limit]
+        token = None
+        if offset + limit < len(items):
+            token = f"{kind}-{next(self._token_ids)}"
+            self._tokens[token] = (kind, items, offset + limit, limit, build)
+        return [build(item) for item in chunk], token
+
+    def events_search(self, query):
+        if query.get('query_type') == 'CONTINUE':
+            kind, items, offset, limit, build = self._tokens.pop(query['token'])
+        else:
+            server_id = query.get('serverId') or self.server_ids()[0]
+            limit = int(query.get('limit', 50))
+            if query.get('query_type') == 'ACTIVE':
+                indices = list(range(max(0, self.config.events - limit), self.config.events))
+            else:
+                indices = self.events_in_range(server_id, query.get('from_time'), query.get('to_time'))
+            items = [(server_id, i) for i in indices]
+            offset = 0
+            build = lambda item: self.event(*item)
+        events, token = self.page('events', items, offset, limit, build)
+        return {'result': {'events': events, 'token': token}}
+
+    def appearance(self, index):
+        base = TIMELINE_START + timedelta(minutes=index)
+        return {
+            'deviceGid': self.camera_ids()[index % self.config.cameras],
+            'objectId': index,
+            'startTime': api_time(base),
+            'snapshots': [
+                {
+                    # Pairs of snapshots share a frame to exercise de-duplication.
+                    'timestamp': api_time(base + timedelta(seconds=s // 2)),
+                    'roi': {'left': 0.1 * (s % 5), 'top': 0.1, 'right': 0.1 * (s % 5) + 0.2, 'bottom': 0.6}
+                }
+                for s in range(self.config.snapshots)
+            ]
+        }
+
+    def appearance_search(self, body):
+        if 'token' in body and len(body) == 1:
+            kind, items, offset, limit, build = self._tokens.pop(body['token'])
+        else:
+            items, offset, limit, build = list(range(self.config.appearances)), 0, int(body.get('limit', 5)), self.appearance
+        results, token = self.page('appearances', items, offset, limit, build)
+        return {'result': {'results': results, 'token': token}}
+
+    def jpeg(self):
+        if self._jpeg is None:
+            width, height = self.config.jpeg_size
+            image = Image.radial_gradient("L").resize((width, height)).convert("RGB")
+            buffered = io.BytesIO()
+            image.save(buffered, format="JPEG", quality=85)
+            self._jpeg = buffered.getvalue()
+        return self._jpeg
+
+    def fmp4(self):
+        # Not a playable clip, but shaped like one (ftyp box first) and of the requested size.
+        header = b'\x00\x00\x00\x18ftypisom\x00\x00\x02\x00isomiso2'
+        return header + b'\x00' * max(0, self.config.video_bytes - len(header))
+
+    def ndjson(self, camera_id, t):
+        start = parse_api_time(t) if t else TIMELINE_START
+        lines = (
+            json.dumps({
+                'timestamp': api_time(start + timedelta(milliseconds=100 * i)),
+                'cameraId': camera_id,
+                'objectId': i % 50,
+                'roi': {'left': 0.1, 'top': 0.2, 'right': 0.3, 'bottom': 0.4},
+                'classification': 'PERSON' if i % 3 else 'VEHICLE'
+            })
+            for i in range(self.config.ndjson_records)
+        )
+        return ('\n'.join(lines) + '\n').encode()
+
+    def get(self, path, query):
+        if path == '/health':
+            return {'status': 'ok'}
+        if path == '/servers':
+            return {'result': {'servers': [{'id': s, 'name': s.replace('-', ' ').title()} for s in self.server_ids()]}}
+        if path == '/cameras':
+            return {'result': {'cameras': [{'id': c, 'name': c.replace('-', ' ').title()} for c in self.camera_ids()]}}
+        if path in ('/sites', '/site', '/wep-capabilities'):
+            return {'result': {}}
+        if path == '/event-subtopics':
+            return {'result': EVENT_TYPES}
+        if path == '/appearance-descriptions':
+            return {'result': [{'facet': 'GENDER', 'tag': 'MALE'}, {'facet': 'GENDER', 'tag': 'FEMALE'}, {'facet': 'UPPER_CLOTHING_COLOR', 'tag': 'RED'}]}
+        if path == '/events-search':
+            return self.events_search(query)
+        return None
+
+def make_handler(backend, prefix):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_body(self, body, content_type, status=200):
+            if backend.config.latency_ms:
+                time.sleep(backend.config.latency_ms / 1000)
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            backend.count(len(body))
+
+        def route(self):
+            parsed = urlparse(self.path)
+            path = parsed.path[len(prefix):] if parsed.path.startswith(prefix) else parsed.path
+            return path, {k: v[0] for k, v in parse_qs(parsed.query).items()}
+
+        def do_GET(self):
+            path, query = self.route()
+            if backend.config.error_rate and random.random() < backend.config.error_rate:
+                # Simulated overload, for exercising the frontend's retries and circuit breaker.
+                return self.send_body(b'{"error": "unavailable"}', 'application/json', 503)
+            if path == '/media':
+                media_format = query.get('format', 'fmp4')
+                if media_format == 'jpeg':
+                    return self.send_body(backend.jpeg(), 'image/jpeg')
+                if media_format == 'json':
+                    return self.send_body(backend.ndjson(query.get('cameraId'), query.get('t')), 'application/x-ndjson')
+                return self.send_body(backend.fmp4(), 'video/mp4')
+            try:
+                data = backend.get(path, query)
+            except KeyError:
+                return self.send_body(b'{"error": "unknown token"}', 'application/json', 400)
+            if data is None:
+                return self.send_body(b'{"error": "not found"}', 'application/json', 404)
+            self.send_body(json.dumps(data).encode(), 'application/json')
+
+        def do_POST(self):
+            path, _ = self.route()
+            length = int(self.headers.get('Content-Length') or 0)
+            body = json.loads(self.rfile.read(length) or b'{}')
+            if path == '/ingest':
+                # Stand-in for a Duke-Central ingestion endpoint when load-testing replays.
+                return self.send_body(json.dumps({'accepted': len(body) if isinstance(body, list) else 1}).encode(), 'application/json')
+            if path in ('/appearance-search', '/appearance-search-by-description'):
+                try:
+                    return self.send_body(json.dumps(backend.appearance_search(body)).encode(), 'application/json')
+                except KeyError:
+                    return self.send_body(b'{"error": "unknown token"}', 'application/json', 400)
+            self.send_body(b'{"error": "not found"}', 'application/json', 404)
+
+    return Handler
+
+def start_mock_backend(config, host="127.0.0.1", port=0, prefix="/api"):
+    # Starts the server on a daemon thread; returns (server, backend, base_url).
+    backend = MockBackend(config)
+    server = ThreadingHTTPServer((host, port), make_handler(backend, prefix))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, backend, f"http://{host}:{server.server_address[1]}{prefix}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a synthetic Duke-Backend for local benchmarking.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--servers", type=int, default=2)
+    parser.add_argument("--cameras", type=int, default=8)
+    parser.add_argument("--events", type=int, default=1000, help="Events per server across June 2025.")
+    parser.add_argument("--appearances", type=int, default=100)
+    parser.add_argument("--snapshots", type=int, default=3, help="Snapshots per appearance.")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jpeg-size", default="1920x1080")
+    parser.add_argument("--video-mb", type=float, default=5)
+    parser.add_argument("--ndjson-records", type=int, default=2000)
+    parser.add_argument("--error-rate", type=float, default=0, help="Fraction of GETs answered with 503.")
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.jpeg_size.lower().split("x"))
+    config = MockConfig(args.servers, args.cameras, args.events, args.appearances, args.snapshots,
+                        args.latency_ms, (width, height), int(args.video_mb * 1024 * 1024), args.ndjson_records,
+                        args.error_rate)
+    server, _, base_url = start_mock_backend(config, args.host, args.port)
+    print(f"Mock Duke-Backend listening on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from mock_backend import MockConfig, start_mock_backend
+
+# Drives each page against the local mock Duke-Backend with Streamlit's AppTest and reports,
+# per scenario and result size: time of the run that loads the data, time of an idle rerun
+# afterwards, requests issued and peak Python memory allocated during the load.
+
+def widget(widgets, label):
+    return next(w for w in widgets if w.label == label)
+
+def wait_for_reference_data(at, timeout=30):
+    # AppTest does not drive run_every fragments, so rerun until the page stops waiting for
+    # the background reference lookups.
+    deadline = time.time() + timeout
+    while '_reference_wait_started' in at.session_state and time.time() < deadline:
+        time.sleep(0.1)
+        at.run()
+
+def new_app(page, base_url):
+    at = AppTest.from_file(os.path.join(REPO_ROOT, "pages", page), default_timeout=300)
+    at.secrets["API_URL"] = base_url
+    at.secrets["API_BASE"] = base_url
+    at.run()
+    wait_for_reference_data(at)
+    return at
+
+def measure(backend, action):
+    backend.reset_counters()
+    tracemalloc.start()
+    start = time.perf_counter()
+    action()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'load_ms': elapsed * 1000,
+        'requests': backend.request_count,
+        'bytes_received': backend.bytes_sent,
+        'peak_mem_mb': peak / 1e6
+    }
+
+def search_events(at, size):
+    widget(at.number_input, "Limit").set_value(min(size, 1000))
+    widget(at.button, "Search Events").click()
+    at.run()
+
+def fetch_all_events(at, size):
+    widget(at.checkbox, "Fetch All Pages").check()
+    at.run()
+    widget(at.number_input, "Limit").set_value(100)
+    widget(at.number_input, "Max Rows").set_value(size)
+    widget(at.button, "Search Events").click()
+    at.run()
+
+def search_face_events(at, size):
+    widget(at.number_input, "Limit").set_value(min(size, 1000))
+    widget(at.button, "Search Face Events").click()
+    at.run()
+
+def search_appearances(at, size):
+    widget(at.number_input, "Limit").set_value(min(size, 100))
+    widget(at.button, "Search").click()
+    at.run()
+    widget(at.button, "Fetch All ROIs").click()
+    at.run()
+
+def fetch_media_json(at, size):
+    widget(at.text_input, "Camera ID").input("camera-0")
+    widget(at.text_input, "Timestamp (ISO 8601)").input("2025-06-01T00:00:00.000Z")
+    widget(at.selectbox, "Format").select("json")
+    widget(at.button, "Fetch Media").click()
+    at.run()
+
+def probe_endpoints(at, size):
+    widget(at.button, "Fetch Health Check").click()
+    at.run()
+
+SCENARIOS = {
+    'events_search': ("Events.py", search_events),
+    'events_fetch_all': ("Events.py", fetch_all_events),
+    'face_watchlist': ("Face Watchlist.py", search_face_events),
+    'appearance_rois': ("Appearance.py", search_appearances),
+    'media_ndjson': ("Media.py", fetch_media_json),
+    'endpoints': ("Endpoints.py", probe_endpoints),
+}
+
+def run_scenario(name, size, args):
+    page, action = SCENARIOS[name]
+    config = MockConfig(
+        servers=args.servers,
+        events=max(size, 1000),
+        appearances=size,
+        latency_ms=args.latency_ms,
+        ndjson_records=size * 10
+    )
+    server, backend, base_url = start_mock_backend(config)
+    try:
+        st.cache_resource.clear()
+        at = new_app(page, base_url)
+        result = measure(backend, lambda: action(at, size))
+        errors = [e.value for e in at.exception]
+        start = time.perf_counter()
+        at.run()
+        result['idle_rerun_ms'] = (time.perf_counter() - start) * 1000
+        result.update({'scenario': name, 'size': size, 'errors': errors})
+        return result
+    finally:
+        server.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Duke-Frontend pages against a mock Duke-Backend.")
+    parser.add_argument("--sizes", default="50,200,1000", help="Comma-separated result sizes.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenario names.")
+    parser.add_argument("--servers", type=int, default=2)
+    parser.add_argument("--latency-ms", type=float, default=5, help="Artificial latency per mock request.")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+    os.chdir(REPO_ROOT)
+
+    results = []
+    print(f"{'scenario':<18}{'size':>6}{'load ms':>10}{'rerun ms':>10}{'requests':>10}{'MB recv':>9}{'peak MB':>9}")
+    for name in args.scenarios.split(","):
+        for size in (int(s) for s in args.sizes.split(",")):
+            result = run_scenario(name, size, args)
+            results.append(result)
+            print(f"{name:<18}{size:>6}{result['load_ms']:>10.0f}{result['idle_rerun_ms']:>10.0f}"
+                  f"{result['requests']:>10}{result['bytes_received'] / 1e6:>9.1f}{result['peak_mem_mb']:>9.1f}"
+                  + (f"  errors: {result['errors']}" if result['errors'] else ""))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
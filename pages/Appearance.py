@@ -1,13 +1,19 @@
 import streamlit as st
 import json
-import io
-from PIL import Image
 from collections import defaultdict
 import base64
 from utils.api_logger import logged_request
 from utils.setup import global_page_setup
+from utils.pagination import paginate
+from utils.reference_data import get_cameras, get_appearance_descriptions, with_placeholder
+from utils.images import crop_jpeg, make_preview, roi_thumbnails, thumbnail_settings
+from utils.image_cache import get_session_image_cache, show_image_cache_stats
+from utils.frame_cache import fetch_media_frame
+from utils.concurrency import run_concurrently
+from utils.metrics import start_page_timer
 
 st.set_page_config(page_title="Appearance Search", layout="wide")
+start_page_timer("Appearance")
 st.title("Avigilon Appearance Search")
 
 API_BASE = st.secrets.get("API_BASE", "http://localhost:8000/api")
@@ -18,18 +24,7 @@ to_time = st.sidebar.text_input("To (ISO 8601)", "2025-05-30")
 limit = st.sidebar.number_input("Limit", min_value=1, max_value=100, value=5)
 scan_type = st.sidebar.selectbox("Scan Type", ["FULL", "FAST"])
 
-if 'cameras' not in st.session_state:
-    try:
-        cameras_resp = logged_request("get", f"{API_BASE}/cameras")
-        cameras = []
-        if cameras_resp.ok:
-            cameras_data = cameras_resp.json()
-            cameras_list = cameras_data.get("result", {}).get("cameras", [])
-            cameras = [(s.get("name"), s.get("id")) for s in cameras_list]
-        st.session_state['cameras'] = cameras
-    except Exception:
-        st.session_state['cameras'] = []
-cameras = st.session_state['cameras']
+cameras = with_placeholder(get_cameras(API_BASE), "cameras")
 selected_camera_ids = st.sidebar.multiselect(
     "Camera IDs",
     options=[cam[1] for cam in cameras],
@@ -75,17 +70,7 @@ if appearance_search_type == "appearances":
         except Exception:
             appearances_value = []
 elif appearance_search_type == "querydescriptors":
-    if 'appearance_descriptions' not in st.session_state:
-        try:
-            desc_resp = logged_request("get", f"{API_BASE}/appearance-descriptions")
-            desc_options = []
-            if desc_resp.ok:
-                desc_data = desc_resp.json()
-                desc_options = desc_data['result']
-            st.session_state['appearance_descriptions'] = desc_options
-        except Exception:
-            st.session_state['appearance_descriptions'] = []
-    desc_options = st.session_state['appearance_descriptions']
+    desc_options = with_placeholder(get_appearance_descriptions(API_BASE), "appearance descriptors")
     facet_to_tags = defaultdict(list)
     for d in desc_options:
         facet_to_tags[d['facet']].append(d['tag'])
@@ -104,6 +89,7 @@ if 'appearance_results' not in st.session_state:
     st.session_state['appearance_results'] = None
 if 'appearance_token' not in st.session_state:
     st.session_state['appearance_token'] = None
+roi_cache = get_session_image_cache('appearance_roi_cache', int(st.secrets.get("APPEARANCE_IMAGE_CACHE_MB", 64)) * 1024 * 1024)
 
 if search:
     try:
@@ -140,12 +126,134 @@ if search:
             else:
                 st.session_state['appearance_results'] = results
                 st.session_state['appearance_token'] = token
+            st.session_state['appearance_roi_gallery'] = None
+            roi_cache.clear()
     except Exception as e:
         st.error(f"Error: {e}")
 
-if st.session_state.get('appearance_results') is not None:
-    results = st.session_state['appearance_results']
+def fetch_snapshot_roi(device_gid, timestamp, roi):
+    thumbnail_config = thumbnail_settings()
+    # The full frame is kept exactly as /media returned it; only the preview and the crop are encoded, once each.
+    full_image = fetch_media_frame(API_BASE, device_gid, timestamp)
+    preview = make_preview(full_image, thumbnail_config['preview_max_px'], thumbnail_config['quality'])
+    cropped = crop_jpeg(full_image, roi, thumbnail_config['quality'])
+    return full_image, preview, cropped
+
+def show_snapshot_roi(roi_key, full_image, preview, cropped):
+    st.image(preview, caption="Full Image")
+    st.image(cropped, caption="Cropped ROI Image")
+    cols = st.columns(2)
+    cols[0].download_button("Download Full Image", full_image, file_name=f"frame_{roi_key}.jpg", mime="image/jpeg", key=f"download_full_{roi_key}")
+    cols[1].download_button("Download Cropped Image", cropped, file_name=f"roi_{roi_key}.jpg", mime="image/jpeg", key=f"download_roi_{roi_key}")
+    # Base64 is only produced when asked for; st.code adds a copy button.
+    if st.toggle("Show Base64", key=f"show_b64_{roi_key}"):
+        st.caption("Base64 of Full Image")
+        st.code(base64.b64encode(full_image).decode(), language="text")
+        st.caption("Base64 of Cropped Image")
+        st.code(base64.b64encode(cropped).decode(), language="text")
+
+def group_snapshots_by_frame(results):
+    # Snapshots of the same (deviceGid, timestamp) share one /media frame.
+    frames = defaultdict(list)
     for idx, instance in enumerate(results):
+        device_gid = instance.get('deviceGid')
+        for snap_idx, snap in enumerate(instance.get('snapshots', [])):
+            timestamp = snap.get('timestamp')
+            roi = snap.get('roi')
+            if device_gid and timestamp and roi:
+                frames[(device_gid, timestamp)].append(((idx, snap_idx), roi))
+    return list(frames.items())
+
+def fetch_frame_rois(frame, thumbnail_config):
+    (device_gid, timestamp), snapshots = frame
+    crops = roi_thumbnails(fetch_media_frame(API_BASE, device_gid, timestamp), [roi for _, roi in snapshots], thumbnail_config)
+    return [(position, crop) for (position, _), crop in zip(snapshots, crops)]
+
+def fetch_all_rois(results):
+    frames = group_snapshots_by_frame(results)
+    snapshot_count = sum(len(snapshots) for _, snapshots in frames)
+    thumbnail_config = thumbnail_settings()
+    concurrency = int(st.secrets.get("MEDIA_FETCH_CONCURRENCY", 8))
+    progress = st.progress(0.0, text=f"Fetching {len(frames)} unique frames for {snapshot_count} snapshots...")
+    gallery = []
+    done = 0
+    for frame, crops, error in run_concurrently(lambda f: fetch_frame_rois(f, thumbnail_config), frames, concurrency):
+        done += 1
+        if error is not None:
+            st.warning(f"Failed to fetch frame {frame[0][1]} from {frame[0][0]}: {error}")
+        else:
+            gallery.extend(crops)
+        progress.progress(done / len(frames), text=f"Fetched {done}/{len(frames)} unique frames")
+    progress.empty()
+    st.session_state['appearance_roi_gallery'] = sorted(gallery, key=lambda item: item[0])
+
+def show_roi_gallery(gallery, columns=6):
+    st.caption(f"{len(gallery)} ROI crops")
+    for row_start in range(0, len(gallery), columns):
+        cols = st.columns(columns)
+        for col, ((idx, snap_idx), crop) in zip(cols, gallery[row_start:row_start + columns]):
+            col.image(crop, caption=f"Instance {idx + 1} / snapshot {snap_idx + 1}")
+
+@st.fragment
+def snapshot_roi_panel(roi_key, device_gid, snap):
+    # Fragment: a fetch here reruns only this snapshot's panel, not every loaded instance.
+    if st.button(f"Fetch ROI {roi_key}", key=f"fetch_roi_{roi_key}"):
+        timestamp = snap.get('timestamp')
+        roi = snap.get('roi')
+        if device_gid and timestamp and roi:
+            with st.spinner("Fetching and cropping image to ROI..."):
+                try:
+                    roi_cache.put(roi_key, fetch_snapshot_roi(device_gid, timestamp, roi))
+                except Exception as e:
+                    st.error(f"Failed to fetch/crop image: {e}")
+        else:
+            st.warning("Missing deviceGid, timestamp, or roi for ROI fetch.")
+    cached = roi_cache.get(roi_key)
+    if cached is not None:
+        show_snapshot_roi(roi_key, *cached)
+
+def extend_appearance_search():
+    with st.spinner("Fetching more appearances..."):
+        try:
+            if appearance_search_type == "appearances":
+                payload = {
+                    "token": st.session_state['appearance_token']
+                }
+                endpoint = f"{API_BASE}/appearance-search"
+            elif appearance_search_type == "querydescriptors":
+                payload = {
+                    "token": st.session_state['appearance_token']
+                }
+                endpoint = f"{API_BASE}/appearance-search-by-description"
+            resp = logged_request("post", endpoint, json=payload)
+            data = resp.json()
+            more_results = data.get('result',{}).get('results',{})
+            new_token = data.get('result',{}).get('token')
+            if more_results:
+                st.session_state['appearance_results'].extend(more_results)
+                if new_token and new_token != st.session_state['appearance_token']:
+                    st.session_state['appearance_token'] = new_token
+                else:
+                    st.session_state['appearance_token'] = None
+                st.rerun(scope="fragment")
+            else:
+                st.session_state['appearance_token'] = None
+                st.info("No more appearances found.")
+        except Exception as e:
+            st.error(f"Error: {e}")
+
+@st.fragment
+def appearance_results_panel():
+    # Fragment: paging, Fetch All ROIs and Extend Search rerun only the results, not the sidebar or API log.
+    results = st.session_state['appearance_results']
+    if st.button("Fetch All ROIs", key="fetch_all_rois"):
+        fetch_all_rois(results)
+    if st.session_state.get('appearance_roi_gallery'):
+        with st.expander("ROI Gallery", expanded=True):
+            show_roi_gallery(st.session_state['appearance_roi_gallery'])
+    start, end = paginate(len(results), "appearance_results")
+    for idx in range(start, end):
+        instance = results[idx]
         st.markdown(f"### Instance {idx+1}")
         st.write({k: v for k, v in instance.items() if k != 'snapshots'})
         snapshots = instance.get('snapshots', [])
@@ -155,73 +263,16 @@ if st.session_state.get('appearance_results') is not None:
                 with cols[0]:
                     st.json(snap)
                 with cols[1]:
-                    if st.button(f"Fetch ROI {idx}_{snap_idx}", key=f"fetch_roi_{idx}_{snap_idx}"):
-                        device_gid = instance.get('deviceGid')
-                        timestamp = snap.get('timestamp')
-                        roi = snap.get('roi')
-                        if device_gid and timestamp and roi:
-                            params = {
-                                'cameraId': device_gid,
-                                't': timestamp,
-                                'format': 'jpeg'
-                            }
-                            with st.spinner("Fetching and cropping image to ROI..."):
-                                try:
-                                    media_resp = logged_request("get", f"{API_BASE}/media", params=params)
-                                    media_resp.raise_for_status()
-                                    image = Image.open(io.BytesIO(media_resp.content))
-                                    st.image(image)
-                                    buffered = io.BytesIO()
-                                    image.save(buffered, format="JPEG")
-                                    img_b64 = base64.b64encode(buffered.getvalue()).decode()
-                                    st.text_area("Base64 of Full Image", img_b64, height=150)
-                                    width, height = image.size
-                                    left = int(roi['left'] * width)
-                                    top = int(roi['top'] * height)
-                                    right = int(roi['right'] * width)
-                                    bottom = int(roi['bottom'] * height)
-                                    cropped = image.crop((left, top, right, bottom))
-                                    st.image(cropped)
-                                    buffered = io.BytesIO()
-                                    cropped.save(buffered, format="JPEG")
-                                    img_b64 = base64.b64encode(buffered.getvalue()).decode()
-                                    st.text_area("Base64 of Cropped Image", img_b64, height=150)
-                                except Exception as e:
-                                    st.error(f"Failed to fetch/crop image: {e}")
-                        else:
-                            st.warning("Missing deviceGid, timestamp, or roi for ROI fetch.")
+                    snapshot_roi_panel(f"{idx}_{snap_idx}", instance.get('deviceGid'), snap)
         else:
             st.info("No snapshots available for this instance.")
 
     if st.session_state.get('appearance_token'):
         if st.button("Extend Search", key="extend_search"):
-            with st.spinner("Fetching more appearances..."):
-                try:
-                    if appearance_search_type == "appearances":
-                        payload = {
-                            "token": st.session_state['appearance_token']
-                        }
-                        endpoint = f"{API_BASE}/appearance-search"
-                    elif appearance_search_type == "querydescriptors":
-                        payload = {
-                            "token": st.session_state['appearance_token']
-                        }
-                        endpoint = f"{API_BASE}/appearance-search-by-description"
-                    resp = logged_request("post", endpoint, json=payload)
-                    data = resp.json()
-                    more_results = data.get('result',{}).get('results',{})
-                    new_token = data.get('result',{}).get('token')
-                    if more_results:
-                        st.session_state['appearance_results'].extend(more_results)
-                        if new_token and new_token != st.session_state['appearance_token']:
-                            st.session_state['appearance_token'] = new_token
-                        else:
-                            st.session_state['appearance_token'] = None
-                        st.rerun()
-                    else:
-                        st.session_state['appearance_token'] = None
-                        st.info("No more appearances found.")
-                except Exception as e:
-                    st.error(f"Error: {e}")
+            extend_appearance_search()
+
+if st.session_state.get('appearance_results') is not None:
+    appearance_results_panel()
 
+show_image_cache_stats(roi_cache, "ROI Image Cache")
 global_page_setup()
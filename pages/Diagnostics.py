@@ -0,0 +1,101 @@
+import streamlit as st
+import pandas as pd
+from utils.setup import global_page_setup
+from utils.metrics import start_page_timer, get_metrics_store
+from utils.frame_cache import get_frame_cache
+from utils.governor import get_governor
+
+st.set_page_config(page_title="Diagnostics", layout="wide")
+start_page_timer("Diagnostics")
+st.title("Frontend Diagnostics")
+
+LATENCY_BUCKETS_MS = [0, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf")]
+
+def summarize(df):
+    grouped = df.groupby('name')
+    summary = pd.DataFrame({
+        'count': grouped.size(),
+        'errors': grouped['error'].apply(lambda s: s.notna().sum()),
+        'p50_ms': grouped['latency_ms'].quantile(0.50),
+        'p95_ms': grouped['latency_ms'].quantile(0.95),
+        'p99_ms': grouped['latency_ms'].quantile(0.99),
+        'max_ms': grouped['latency_ms'].max(),
+        'total_bytes': grouped['bytes'].sum(),
+        'avg_bytes': grouped['bytes'].mean()
+    })
+    summary['error_rate'] = summary['errors'] / summary['count']
+    return summary.round(1).sort_values('count', ascending=False)
+
+store = get_metrics_store()
+samples = pd.DataFrame(store.samples())
+
+st.sidebar.header("Diagnostics")
+if st.sidebar.button("Reset Metrics"):
+    store.clear()
+    samples = pd.DataFrame()
+
+if samples.empty:
+    st.info("No metrics recorded yet. Use the other pages to generate Duke-Backend traffic.")
+else:
+    samples['time'] = pd.to_datetime(samples['time'], unit='s')
+    requests_df = samples[samples['kind'] == 'request']
+    pages_df = samples[samples['kind'] == 'page']
+    first_paint_df = samples[samples['kind'] == 'first_paint']
+
+    st.caption(f"{len(samples)} samples since {samples['time'].min():%Y-%m-%d %H:%M:%S} (shared across all sessions)")
+    st.download_button(
+        "Download Samples (CSV)",
+        samples.to_csv(index=False),
+        file_name="duke_frontend_metrics.csv",
+        mime="text/csv"
+    )
+
+    st.header("Duke-Backend Requests")
+    if requests_df.empty:
+        st.info("No requests recorded yet.")
+    else:
+        summary = summarize(requests_df)
+        st.dataframe(summary, use_container_width=True)
+        st.download_button(
+            "Download Endpoint Summary (CSV)",
+            summary.to_csv(),
+            file_name="duke_frontend_endpoint_summary.csv",
+            mime="text/csv"
+        )
+        endpoint = st.selectbox("Latency Histogram for Endpoint", summary.index)
+        latencies = requests_df.loc[requests_df['name'] == endpoint, 'latency_ms']
+        histogram = pd.cut(latencies, LATENCY_BUCKETS_MS, right=False).value_counts(sort=False)
+        histogram.index = [f"<{b.right:g} ms" if b.right != float("inf") else f">={b.left:g} ms" for b in histogram.index]
+        st.bar_chart(histogram)
+
+    st.header("Time to First Paint")
+    if first_paint_df.empty:
+        st.info("No page loads recorded yet.")
+    else:
+        st.dataframe(summarize(first_paint_df)[['count', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms']], use_container_width=True)
+
+    st.header("Page Reruns")
+    if pages_df.empty:
+        st.info("No page reruns recorded yet.")
+    else:
+        st.dataframe(summarize(pages_df)[['count', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms']], use_container_width=True)
+        st.line_chart(pages_df.pivot_table(index='time', columns='name', values='latency_ms'))
+
+st.header("Shared Frame Cache")
+frame_cache = get_frame_cache()
+frame_stats = frame_cache.stats()
+st.caption(f"{frame_stats['entries']} frames, {frame_stats['bytes'] / 1e6:.1f} / {frame_stats['max_bytes'] / 1e6:.0f} MB, {frame_stats['in_flight']} downloads in flight")
+cols = st.columns(5)
+cols[0].metric("Hits", frame_stats['hits'])
+cols[1].metric("Misses", frame_stats['misses'])
+cols[2].metric("Coalesced", frame_stats['coalesced'], help="Requests that waited on another session's in-flight download.")
+cols[3].metric("Evictions", frame_stats['evictions'])
+if cols[4].button("Clear Frame Cache"):
+    frame_cache.clear()
+
+st.header("Backend Limiter")
+st.caption("Process-wide in-flight caps, token-bucket rates and circuit breakers per endpoint class.")
+governor = get_governor()
+st.dataframe(pd.DataFrame(governor.stats()).set_index('class'), use_container_width=True)
+
+global_page_setup()
@@ -1,8 +1,13 @@
 import streamlit as st
+import time
+from collections import Counter, deque
 from utils.api_logger import logged_request
+from utils.concurrency import run_concurrently
 from utils.setup import global_page_setup
+from utils.metrics import start_page_timer
 
 st.set_page_config(page_title="Avigilon Endpoints", layout="wide")
+start_page_timer("Endpoints")
 st.title("Avigilon API Endpoints Explorer")
 
 API_BASE = st.secrets.get("API_BASE", "http://localhost:8000/api")
@@ -18,13 +23,98 @@ endpoints = [
     ("Appearance Descriptions", "/appearance-descriptions", "GET")
 ]
 
+PROBE_SAMPLE_CAPACITY = 5000
+
+def probe_endpoint(endpoint):
+    name, path, method = endpoint
+    params = {"id": st.session_state['site_id']} if path == "/site" and st.session_state.get('site_id') else None
+    start = time.perf_counter()
+    sample = {'time': time.time(), 'endpoint': name, 'status': None, 'latency_ms': None, 'bytes': 0, 'error': None}
+    try:
+        resp = logged_request(method.lower(), API_BASE + path, params=params)
+        sample['status'] = resp.status_code
+        sample['bytes'] = len(resp.content)
+        if not resp.ok:
+            sample['error'] = f"HTTP {resp.status_code}"
+    except Exception as e:
+        sample['error'] = str(e)
+    sample['latency_ms'] = (time.perf_counter() - start) * 1000
+    return sample
+
+def probe_round():
+    # One round calls every endpoint at once; latency includes any wait in the backend limiter.
+    samples = st.session_state['probe_samples']
+    st.session_state['probe_rounds'] = st.session_state.get('probe_rounds', 0) + 1
+    for _, sample, _ in run_concurrently(probe_endpoint, endpoints, len(endpoints)):
+        sample['round'] = st.session_state['probe_rounds']
+        samples.append(sample)
+
+def status_summary(statuses):
+    counts = Counter('error' if s is None else str(int(s)) for s in statuses)
+    return ", ".join(f"{status}×{count}" for status, count in sorted(counts.items()))
+
+def show_probe_results():
+    import pandas as pd
+    samples = st.session_state['probe_samples']
+    if not samples:
+        st.info("No probes run yet.")
+        return
+    df = pd.DataFrame(list(samples))
+    df['time'] = pd.to_datetime(df['time'], unit='s')
+    grouped = df.groupby('endpoint')
+    summary = pd.DataFrame({
+        'probes': grouped.size(),
+        'errors': grouped['error'].apply(lambda s: s.notna().sum()),
+        'p50_ms': grouped['latency_ms'].quantile(0.50),
+        'p95_ms': grouped['latency_ms'].quantile(0.95),
+        'p99_ms': grouped['latency_ms'].quantile(0.99),
+        'max_ms': grouped['latency_ms'].max(),
+        'avg_bytes': grouped['bytes'].mean(),
+        'statuses': grouped['status'].apply(status_summary)
+    }).round(1)
+    st.caption(f"{len(df)} probes over {st.session_state['probe_rounds']} rounds (keeping the last {samples.maxlen})")
+    st.dataframe(summary, use_container_width=True)
+    st.line_chart(df.pivot_table(index='time', columns='endpoint', values='latency_ms'))
+    st.download_button("Download probes (CSV)", df.to_csv(index=False), "endpoint_probes.csv", "text/csv")
+
+def continuous_probe_panel():
+    # Runs as an isolated fragment so each round reruns only the probe results.
+    probe_round()
+    show_probe_results()
+
+st.header("Probe All Endpoints")
+st.caption("Calls every endpoint below concurrently and reports latency percentiles, payload sizes and status codes per endpoint.")
+if not isinstance(st.session_state.get('probe_samples'), deque):
+    st.session_state['probe_samples'] = deque(maxlen=PROBE_SAMPLE_CAPACITY)
+    st.session_state['probe_rounds'] = 0
+cols = st.columns(4)
+probe_mode = cols[0].radio("Mode", ["Fixed Rounds", "Continuous"], key="probe_mode")
+probe_count = cols[1].number_input("Rounds", min_value=1, max_value=1000, value=10, disabled=probe_mode == "Continuous")
+probe_interval = cols[2].number_input("Interval (seconds)", min_value=0.0 if probe_mode == "Fixed Rounds" else 1.0, max_value=3600.0, value=1.0, step=0.5)
+if cols[3].button("Clear Probes"):
+    st.session_state['probe_samples'].clear()
+    st.session_state['probe_rounds'] = 0
+
+if probe_mode == "Continuous":
+    st.fragment(continuous_probe_panel, run_every=probe_interval)()
+else:
+    if st.button("Probe All"):
+        progress = st.progress(0.0, text="Probing...")
+        for i in range(int(probe_count)):
+            if i:
+                time.sleep(probe_interval)
+            probe_round()
+            progress.progress((i + 1) / probe_count, text=f"Round {i + 1} of {int(probe_count)}")
+        progress.empty()
+    show_probe_results()
+
 st.header("API Endpoints")
 for name, path, method in endpoints:
     st.subheader(name)
     url = API_BASE + path
     if method == "GET":
         if path == "/site":
-            site_id = st.text_input(f"Site ID for {name}", "")
+            site_id = st.text_input(f"Site ID for {name}", "", key="site_id")
             params = {"id": site_id} if site_id else {}
             if st.button(f"Fetch {name}"):
                 with st.spinner(f"Fetching {name}..."):
@@ -1,55 +1,180 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime
-import json
 from utils.api_logger import logged_request
 from utils.setup import global_page_setup
+from utils.metrics import start_page_timer
+from utils.events_search import fetch_events_page, iter_event_pages, fetch_all_events, fetch_time_sliced_events, merge_by_timestamp
+from utils.concurrency import run_concurrently
+from utils.live_tail import LiveTailBuffer
+from utils.events_frame import flatten_events, compact_events_frame, events_frame, event_api_timestamp, RAW_TIMESTAMP_COLUMN
+from utils.media_download import show_streamed_video
+from utils.ndjson import show_ndjson_media
+from utils.reference_data import get_servers, get_event_subtopics, with_placeholder
 
 st.set_page_config(page_title="Events", layout="wide")
+start_page_timer("Events")
 st.title("Avigilon Server Events Dashboard")
 
 API_URL = st.secrets.get("API_URL", "http://localhost:8000/api")
 
 st.sidebar.header("Event Search Settings")
 
-if 'servers' not in st.session_state:
-    try:
-        servers_resp = logged_request("get", f"{API_URL}/servers")
-        servers = []
-        if servers_resp.ok:
-            servers_data = servers_resp.json()
-            servers_list = servers_data.get("result", {}).get("servers", [])
-            servers = [(s.get("name"), s.get("id")) for s in servers_list]
-        st.session_state['servers'] = servers
-    except Exception:
-        st.session_state['servers'] = []
-servers = st.session_state['servers']
-if 'event_subtopics' not in st.session_state:
-    try:
-        topics_resp = logged_request("get", f"{API_URL}/event-subtopics")
-        event_subtopics = []
-        if topics_resp.ok:
-            topics_data = topics_resp.json()
-            event_subtopics = topics_data.get("result", [])
-        st.session_state['event_subtopics'] = event_subtopics
-    except Exception:
-        st.session_state['event_subtopics'] = []
-event_subtopics = st.session_state['event_subtopics']
+servers = with_placeholder(get_servers(API_URL), "servers")
+event_subtopics = with_placeholder(get_event_subtopics(API_URL), "event subtopics")
 
 query_type = st.sidebar.selectbox("Query Type", ["TIME_RANGE", "ACTIVE"])
-server_id = st.sidebar.selectbox("Server ID", options=[s[1] for s in servers], format_func=lambda x: next((name for name, id_ in servers if id_ == x), x))
+ALL_SERVERS = "__all__"
+server_names = dict((id_, name) for name, id_ in servers)
+server_names[ALL_SERVERS] = "All servers"
+server_id = st.sidebar.selectbox("Server ID", options=[s[1] for s in servers] + [ALL_SERVERS], format_func=lambda x: server_names.get(x, x))
 from_date = st.sidebar.date_input("From Date", datetime(2025, 6, 1))
 to_date = st.sidebar.date_input("To Date", datetime(2025, 6, 30))
 from_time = datetime.combine(from_date, datetime.min.time()).isoformat() + ".000Z"
 to_time = datetime.combine(to_date, datetime.min.time()).isoformat() + ".000Z"
 limit = st.sidebar.number_input("Limit",  value=50, min_value=1, max_value=1000)
 event_topics = st.sidebar.selectbox("Event Topics", event_subtopics)
+time_slices = st.sidebar.number_input(
+    "Time Slices",
+    value=1,
+    min_value=1,
+    max_value=64,
+    disabled=query_type != "TIME_RANGE",
+    help="Split the date range into this many windows and drain them in parallel (single server TIME_RANGE searches)."
+)
+fetch_all = st.sidebar.checkbox("Fetch All Pages", help="Follow the continuation token until the search is exhausted or the row cap is reached.")
+max_rows = st.sidebar.number_input(
+    "Max Rows",
+    value=10000,
+    min_value=1,
+    max_value=1000000,
+    disabled=not (fetch_all or server_id == ALL_SERVERS or time_slices > 1),
+    help="Row cap for Fetch All Pages, per server in All servers mode and per window with Time Slices."
+)
+live_tail = st.sidebar.toggle("Live Tail", disabled=query_type != "ACTIVE", help="Poll ACTIVE events and keep a rolling, de-duplicated buffer.")
+if live_tail and query_type == "ACTIVE":
+    poll_interval = st.sidebar.number_input("Poll Interval (s)", value=5, min_value=1, max_value=300)
+    retention = st.sidebar.number_input("Retention (rows)", value=1000, min_value=10, max_value=100000)
 search_clicked = st.sidebar.button("Search Events")
 
 if 'events_df' not in st.session_state:
     st.session_state['events_df'] = None
 if 'events_token' not in st.session_state:
     st.session_state['events_token'] = None
+if 'events_drain_chunks' not in st.session_state:
+    st.session_state['events_drain_chunks'] = None
+
+def finish_events_drain():
+    chunks = st.session_state['events_drain_chunks']
+    st.session_state['events_drain_chunks'] = None
+    if chunks:
+        st.session_state['events_df'] = events_frame(chunks)
+    else:
+        st.session_state['events_df'] = None
+        st.session_state['events_token'] = None
+    return sum(len(chunk) for chunk in chunks or [])
+
+DRAIN_PREVIEW_ROWS = 200
+
+def latest_rows(chunks, n):
+    # Only the trailing chunks that cover the last n rows are concatenated, not the whole drain.
+    import pandas as pd
+    tail = []
+    rows = 0
+    for chunk in reversed(chunks):
+        tail.append(chunk)
+        rows += len(chunk)
+        if rows >= n:
+            break
+    return pd.concat(reversed(tail), ignore_index=True).tail(n)
+
+def drain_events(params, max_rows):
+    # Pages are kept as a list of chunks and concatenated once at the end, so loading N pages stays linear.
+    # Chunks live in session_state so a Cancel click (which interrupts this run) keeps what was fetched.
+    st.session_state['events_drain_chunks'] = []
+    st.session_state['events_df'] = None
+    st.session_state['events_token'] = None
+    chunks = st.session_state['events_drain_chunks']
+    status = st.empty()
+    st.button("Cancel", key="cancel_events_drain")
+    partial_table = st.empty()
+    rows = 0
+    exhausted = True
+    try:
+        for events, token in iter_event_pages(API_URL, params):
+            chunk = flatten_events(events)
+            chunks.append(chunk)
+            st.session_state['events_token'] = token
+            rows += len(chunk)
+            status.info(f"Fetched {rows} events in {len(chunks)} pages, showing the latest {min(rows, DRAIN_PREVIEW_ROWS)}...")
+            partial_table.dataframe(latest_rows(chunks, DRAIN_PREVIEW_ROWS), height=300)
+            if rows >= max_rows:
+                exhausted = False
+                break
+        if exhausted:
+            st.session_state['events_token'] = None
+    except Exception as e:
+        st.error(f"Failed to fetch events: {e}")
+    status.empty()
+    partial_table.empty()
+    if not finish_events_drain():
+        st.info("No events found for the given parameters.")
+
+def search_all_servers(params, max_rows):
+    # Every server drains its own continuation chain in parallel; the per-server streams are then
+    # heap-merged by timestamp, so latency tracks the slowest server rather than the sum.
+    status = st.empty()
+    server_ids = [s[1] for s in servers]
+    concurrency = int(st.secrets.get("SEARCH_CONCURRENCY", 8))
+    streams = []
+    capped = []
+    done = 0
+    for sid, events, error in run_concurrently(
+        lambda sid: fetch_all_events(API_URL, {**params, "serverId": sid}, max_rows), server_ids, concurrency
+    ):
+        done += 1
+        if error is not None:
+            st.warning(f"Failed to fetch events from {server_names.get(sid, sid)}: {error}")
+        else:
+            streams.append(events)
+            if len(events) >= max_rows:
+                capped.append(server_names.get(sid, sid))
+        status.info(f"Searched {done}/{len(server_ids)} servers, {sum(len(e) for e in streams)} events...")
+    status.empty()
+    merged = list(merge_by_timestamp(streams))
+    st.session_state['events_token'] = None
+    if merged:
+        st.session_state['events_df'] = compact_events_frame(flatten_events(merged))
+        if capped:
+            st.info(f"Stopped at {max_rows} events for: {', '.join(capped)}.")
+    else:
+        st.session_state['events_df'] = None
+        st.info("No events found for the given parameters.")
+
+def search_time_slices(params, max_rows):
+    status = st.empty()
+    start = datetime.combine(from_date, datetime.min.time())
+    end = datetime.combine(to_date, datetime.min.time())
+    events, errors, capped = fetch_time_sliced_events(
+        API_URL, params, start, end, time_slices, max_rows,
+        int(st.secrets.get("SEARCH_CONCURRENCY", 8)),
+        on_progress=lambda done, total: status.info(f"Searched {done}/{total} time windows...")
+    )
+    status.empty()
+    for (window_start, window_end), error in errors:
+        st.warning(f"Failed to fetch events for {window_start} - {window_end}: {error}")
+    if capped:
+        st.warning(f"Stopped at {max_rows} events in {len(capped)} time windows, so these have gaps: "
+                   f"{', '.join(f'{s} - {e}' for s, e in capped)}. Raise Max Rows or add more time slices.")
+    st.session_state['events_token'] = None
+    if events:
+        st.session_state['events_df'] = compact_events_frame(flatten_events(events))
+    else:
+        st.session_state['events_df'] = None
+        st.info("No events found for the given parameters.")
+
+if st.session_state['events_drain_chunks'] is not None:
+    rows = finish_events_drain()
+    st.warning(f"Search cancelled after {rows} events.")
 
 if search_clicked:
     if(query_type == "ACTIVE"):
@@ -67,72 +192,128 @@ if search_clicked:
             "limit": limit,
             "eventTopics": event_topics
         }
-    with st.spinner("Fetching events from server..."):
-        try:
-            resp = logged_request("get", f"{API_URL}/events-search", params=params)
-            resp.raise_for_status()
-            data = resp.json()
-            events = data['result']['events']
-            token = data['result'].get('token')
-            if not events:
+    if server_id == ALL_SERVERS:
+        with st.spinner("Fetching events from all servers..."):
+            search_all_servers(params, max_rows)
+    elif query_type == "TIME_RANGE" and time_slices > 1:
+        with st.spinner("Fetching events by time window..."):
+            search_time_slices(params, max_rows)
+    elif fetch_all:
+        drain_events(params, max_rows)
+    else:
+        with st.spinner("Fetching events from server..."):
+            try:
+                resp = logged_request("get", f"{API_URL}/events-search", params=params)
+                resp.raise_for_status()
+                data = resp.json()
+                events = data['result']['events']
+                token = data['result'].get('token')
+                if not events:
+                    st.session_state['events_df'] = None
+                    st.session_state['events_token'] = None
+                    st.info("No events found for the given parameters.")
+                else:
+                    df = compact_events_frame(flatten_events(events))
+                    st.session_state['events_df'] = df
+                    st.session_state['events_token'] = token
+            except Exception as e:
                 st.session_state['events_df'] = None
                 st.session_state['events_token'] = None
-                st.info("No events found for the given parameters.")
-            else:
-                df = pd.DataFrame(events)
-                st.session_state['events_df'] = df
-                st.session_state['events_token'] = token
-        except Exception as e:
-            st.session_state['events_df'] = None
-            st.session_state['events_token'] = None
-            st.error(f"Failed to fetch events: {e}")
+                st.error(f"Failed to fetch events: {e}")
 
-if st.session_state.get('events_df') is not None:
+def poll_active_events():
+    buffer = st.session_state['live_tail']
+    server_ids = [s[1] for s in servers] if server_id == ALL_SERVERS else [server_id]
+    params = {"query_type": "ACTIVE", "limit": limit}
+    polled = []
+    for sid, events, error in run_concurrently(
+        lambda sid: fetch_events_page(API_URL, {**params, "serverId": sid})[0], server_ids, int(st.secrets.get("SEARCH_CONCURRENCY", 8))
+    ):
+        if error is not None:
+            st.warning(f"Failed to poll {server_names.get(sid, sid)}: {error}")
+        else:
+            polled.extend(events)
+    buffer.add(polled)
+
+def live_tail_panel():
+    # Runs as an isolated fragment: each poll reruns only this function, not the whole page.
+    buffer = st.session_state['live_tail']
+    poll_active_events()
+    cols = st.columns(5)
+    cols[0].metric("Buffered", len(buffer))
+    cols[1].metric("New This Poll", buffer.last_new)
+    cols[2].metric("Evicted", buffer.evicted)
+    cols[3].metric("Polls", buffer.polls)
+    if cols[4].button("Clear Buffer", key="clear_live_tail"):
+        st.session_state['live_tail'] = LiveTailBuffer(retention)
+        buffer = st.session_state['live_tail']
+    if len(buffer):
+        st.dataframe(buffer.newest_first(), height=400, use_container_width=True)
+    else:
+        st.info("Waiting for active events...")
+
+if live_tail and query_type == "ACTIVE":
+    if not isinstance(st.session_state.get('live_tail'), LiveTailBuffer):
+        st.session_state['live_tail'] = LiveTailBuffer(retention)
+    st.session_state['live_tail'].resize(retention)
+    st.subheader(f"Live Tail (every {poll_interval}s)")
+    st.fragment(live_tail_panel, run_every=poll_interval)()
+
+@st.fragment
+def media_events_panel():
+    # Fragment: row selection and media fetches rerun only this tab, not the loaded event list.
+    df = st.session_state['events_df']
+    filtered_df = df[df['type'] == 'DEVICE_FACET_START']
+    display_cols = ['thisId', 'timestamp', 'originatingEventId', 'originatingServerId', 'recordTriggerParams', 'cameraId']
+    available_cols = [col for col in filtered_df.columns if col.split('.')[0] in display_cols]
+    if not filtered_df.empty and available_cols:
+        media_table = filtered_df[available_cols].reset_index(drop=True)
+        raw_timestamps = filtered_df[[c for c in ['timestamp', RAW_TIMESTAMP_COLUMN] if c in filtered_df.columns]]
+        selection = st.dataframe(
+            media_table,
+            height=400,
+            use_container_width=True,
+            hide_index=True,
+            on_select="rerun",
+            selection_mode="multi-row",
+            key="media_events_table"
+        )
+        selected_rows = selection.selection.rows
+        cols = st.columns([1, 1, 3])
+        fetch_type = cols[0].selectbox("Fetch Type", options=["Video", "JSON"], key="media_fetch_type")
+        fetch_clicked = cols[1].button(
+            f"Fetch {fetch_type} for {len(selected_rows)} Selected",
+            key="fetch_selected_media",
+            disabled=not selected_rows or 'cameraId' not in media_table.columns or 'timestamp' not in media_table.columns
+        )
+        if fetch_clicked:
+            for row_idx in selected_rows:
+                row = media_table.iloc[row_idx]
+                st.markdown(f"**{fetch_type} for {row.get('thisId', row_idx)}**")
+                with st.spinner(f"Fetching {fetch_type.lower()}..."):
+                    try:
+                        params = {
+                            'cameraId': row['cameraId'],
+                            't': event_api_timestamp(raw_timestamps, row_idx)
+                        }
+                        if fetch_type == "Video":
+                            show_streamed_video(f"{API_URL}/media", params)
+                        else:
+                            params['format'] = 'json'
+                            show_ndjson_media(f"{API_URL}/media", params)
+                    except Exception as e:
+                        st.error(f"Failed to fetch {fetch_type.lower()}: {e}")
+    else:
+        st.info("No DEVICE_FACET_START events found for the selected parameters.")
+
+@st.fragment
+def events_results_panel():
+    # Fragment: Extend Search reruns only the results, not the sidebar, reference lookups or API log.
     tab1, tab2 = st.tabs(["All Events", "Media Events"])
     with tab1:
         st.dataframe(st.session_state['events_df'], height=600)
     with tab2:
-        df = st.session_state['events_df']
-        filtered_df = df[df['type'] == 'DEVICE_FACET_START']
-        display_cols = ['thisId', 'timestamp', 'originatingEventId', 'originatingServerId', 'recordTriggerParams', 'cameraId']
-        available_cols = [col for col in display_cols if col in filtered_df.columns]
-        if not filtered_df.empty and available_cols:
-            for idx, row in filtered_df.iterrows():
-                cols = st.columns([4, 4])
-                with cols[0]:
-                    st.write({col: row[col] for col in available_cols})
-                with cols[1]:
-                    if 'cameraId' in row and 'timestamp' in row:
-                        fetch_type = st.selectbox(
-                            f"Select fetch type for {row['thisId']}",
-                            options=["Video", "JSON"],
-                            key=f"fetch_type_{idx}"
-                        )
-                        if st.button(f"Fetch {fetch_type} {row['thisId']}", key=f"fetch_{idx}"):
-                            with st.spinner(f"Fetching {fetch_type.lower()}..."):
-                                try:
-                                    params = {
-                                        'cameraId': row['cameraId'],
-                                        't': row['timestamp']
-                                    }
-                                    if fetch_type == "JSON":
-                                        params['format'] = 'json'
-                                    media_resp = logged_request("get", f"{API_URL}/media", params=params)
-                                    media_resp.raise_for_status()
-                                    if fetch_type == "Video":
-                                        st.video(media_resp.content)
-                                    else:
-                                        try:
-                                            ndjson_lines = media_resp.content.decode('utf-8').splitlines()
-                                            for line in ndjson_lines:
-                                                if line.strip():
-                                                    st.json(json.loads(line))
-                                        except Exception:
-                                            st.write(media_resp.content)
-                                except Exception as e:
-                                    st.error(f"Failed to fetch {fetch_type.lower()}: {e}")
-        else:
-            st.info("No DEVICE_FACET_START events found for the selected parameters.")
+        media_events_panel()
     if st.session_state.get('events_token'):
         if st.button("Extend Search", key="extend_search"):
             with st.spinner("Fetching more events..."):
@@ -147,18 +328,21 @@ if st.session_state.get('events_df') is not None:
                     more_events = continue_data['result'].get('events', [])
                     new_token = continue_data['result'].get('token')
                     if more_events:
-                        df = pd.concat([st.session_state['events_df'], pd.DataFrame(more_events)], ignore_index=True)
+                        df = events_frame([st.session_state['events_df'], flatten_events(more_events)])
                         if new_token and new_token != st.session_state['events_token']:
                             st.session_state['events_token'] = new_token
                         else:
                             st.session_state['events_token'] = None
                         st.session_state['events_df'] = df
-                        st.rerun()
+                        st.rerun(scope="fragment")
                     else:
                         st.session_state['events_token'] = None
                         st.info("No more events found.")
                 except Exception as e:
                     st.error(f"Failed to fetch more events: {e}")
+
+if st.session_state.get('events_df') is not None:
+    events_results_panel()
 else:
     st.info("Fill in the parameters and click 'Search Events' to load data.")
 
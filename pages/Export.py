@@ -0,0 +1,95 @@
+import streamlit as st
+import json
+import os
+from datetime import datetime
+from utils.setup import global_page_setup
+from utils.metrics import start_page_timer
+from utils.events_search import format_api_time
+from utils.export import available_export_formats, export_records, iter_search_records, list_chunk_files, replay_chunks
+from utils.reference_data import get_servers, get_event_subtopics, with_placeholder
+
+st.set_page_config(page_title="Export & Replay", layout="wide")
+start_page_timer("Export")
+st.title("Bulk Export & Replay to Duke-Central")
+
+API_URL = st.secrets.get("API_URL", "http://localhost:8000/api")
+EXPORT_DIR = st.secrets.get("EXPORT_DIR", "exports")
+INGEST_URL = st.secrets.get("DUKE_CENTRAL_INGEST_URL", "http://localhost:8001/api/events")
+
+export_tab, replay_tab = st.tabs(["Export", "Replay"])
+
+with export_tab:
+    st.caption("Streams search results to chunk files on disk; nothing is kept in the session.")
+    source = st.selectbox("Source", ["events-search", "appearance-search", "appearance-search-by-description"])
+    if source == "events-search":
+        servers = with_placeholder(get_servers(API_URL), "servers")
+        event_subtopics = with_placeholder(get_event_subtopics(API_URL), "event subtopics")
+        cols = st.columns(4)
+        server_id = cols[0].selectbox("Server ID", options=[s[1] for s in servers], format_func=lambda x: next((name for name, id_ in servers if id_ == x), x))
+        from_date = cols[1].date_input("From Date", datetime(2025, 6, 1))
+        to_date = cols[2].date_input("To Date", datetime(2025, 6, 30))
+        event_topics = cols[3].selectbox("Event Topics", event_subtopics)
+        params = {
+            "query_type": "TIME_RANGE",
+            "from_time": format_api_time(datetime.combine(from_date, datetime.min.time())),
+            "to_time": format_api_time(datetime.combine(to_date, datetime.min.time())),
+            "serverId": server_id,
+            "limit": st.number_input("Page Size", value=500, min_value=1, max_value=1000),
+            "eventTopics": event_topics
+        }
+    else:
+        payload_text = st.text_area(
+            "Search Payload (JSON)",
+            json.dumps({"from_time": "2025-05-01", "to_time": "2025-05-30", "cameraIds": [], "limit": 100, "scanType": "FULL"}, indent=2),
+            height=200
+        )
+        try:
+            params = json.loads(payload_text)
+        except Exception as e:
+            params = None
+            st.error(f"Invalid JSON payload: {e}")
+    cols = st.columns(4)
+    export_format = cols[0].selectbox("Format", available_export_formats())
+    chunk_rows = cols[1].number_input("Records per Chunk", value=1000, min_value=1, max_value=100000)
+    max_records = cols[2].number_input("Max Records (0 = no limit)", value=0, min_value=0)
+    out_dir = cols[3].text_input("Output Directory", EXPORT_DIR)
+    if st.button("Start Export", disabled=params is None):
+        prefix = f"{source}_{datetime.now():%Y%m%d_%H%M%S}"
+        status = st.empty()
+        files, written = 0, 0
+        try:
+            records = iter_search_records(source, API_URL, params)
+            for files, written in export_records(records, out_dir, prefix, export_format, chunk_rows, max_records or None):
+                status.info(f"Wrote {written} records to {files} chunk files...")
+            status.success(f"Exported {written} records to {files} {export_format} chunk files in {out_dir}.")
+        except Exception as e:
+            status.error(f"Export stopped after {written} records in {files} chunk files: {e}")
+
+with replay_tab:
+    st.caption("POSTs exported chunks to a Duke-Central ingestion endpoint as JSON arrays.")
+    replay_dir = st.text_input("Chunk Directory", EXPORT_DIR)
+    chunk_files = list_chunk_files(replay_dir)
+    selected_files = st.multiselect("Chunk Files", chunk_files, default=chunk_files, format_func=os.path.basename)
+    cols = st.columns(3)
+    ingest_url = cols[0].text_input("Ingestion URL", INGEST_URL)
+    batch_size = cols[1].number_input("Records per POST", value=100, min_value=1, max_value=10000)
+    concurrency = cols[2].number_input("Concurrent POSTs", value=4, min_value=1, max_value=64)
+    if st.button("Start Replay", disabled=not selected_files):
+        status = st.empty()
+        metrics = st.columns(4)
+        stats = None
+        for stats in replay_chunks(selected_files, ingest_url, batch_size, concurrency):
+            elapsed = max(stats['elapsed_s'], 1e-6)
+            status.info(f"Sent {stats['batches']} batches...")
+            metrics[0].metric("Records Sent", stats['records'])
+            metrics[1].metric("Records / s", f"{stats['records'] / elapsed:.0f}")
+            metrics[2].metric("Batches / s", f"{stats['batches'] / elapsed:.1f}")
+            metrics[3].metric("Failed Batches", stats['failed_batches'])
+        if stats is None:
+            status.warning("The selected chunks contain no records.")
+        elif stats['failed_batches']:
+            status.warning(f"Replay finished with {stats['failed_batches']} failed batches. Last error: {stats['last_error']}")
+        else:
+            status.success(f"Replayed {stats['records']} records in {stats['elapsed_s']:.1f} s.")
+
+global_page_setup()
@@ -2,28 +2,24 @@ import streamlit as st
 from datetime import datetime
 from utils.api_logger import logged_request
 from utils.setup import global_page_setup
-from PIL import Image
-import io
+from utils.metrics import start_page_timer
+from utils.concurrency import run_concurrently
+from utils.events_search import fetch_time_sliced_events
+from utils.reference_data import get_servers, with_placeholder
+from utils.pagination import paginate
+from utils.image_cache import get_session_image_cache, show_image_cache_stats
+from utils.images import frame_thumbnails, thumbnail_settings
+from utils.frame_cache import fetch_media_frame
 
 st.set_page_config(page_title="Face Watchlist Events", layout="wide")
+start_page_timer("Face Watchlist")
 st.title("Face Watchlist Events Dashboard")
 
 API_URL = st.secrets.get("API_URL", "http://localhost:8000/api")
 
 st.sidebar.header("Face Watchlist Event Search Settings")
 
-if 'servers' not in st.session_state:
-    try:
-        servers_resp = logged_request("get", f"{API_URL}/servers")
-        servers = []
-        if servers_resp.ok:
-            servers_data = servers_resp.json()
-            servers_list = servers_data.get("result", {}).get("servers", [])
-            servers = [(s.get("name"), s.get("id")) for s in servers_list]
-        st.session_state['servers'] = servers
-    except Exception:
-        st.session_state['servers'] = []
-servers = st.session_state['servers']
+servers = with_placeholder(get_servers(API_URL), "servers")
 
 server_id = st.sidebar.selectbox("Server ID", options=[s[1] for s in servers], format_func=lambda x: next((name for name, id_ in servers if id_ == x), x))
 from_date = st.sidebar.date_input("From Date", datetime(2025, 6, 1))
@@ -31,14 +27,34 @@ to_date = st.sidebar.date_input("To Date", datetime(2025, 6, 30))
 from_time = datetime.combine(from_date, datetime.min.time()).isoformat() + ".000Z"
 to_time = datetime.combine(to_date, datetime.min.time()).isoformat() + ".000Z"
 limit = st.sidebar.number_input("Limit",  value=50, min_value=1, max_value=1000)
+media_concurrency = st.sidebar.number_input(
+    "Media Fetch Concurrency",
+    value=int(st.secrets.get("MEDIA_FETCH_CONCURRENCY", 8)),
+    min_value=1,
+    max_value=32
+)
+image_cache_mb = st.sidebar.number_input(
+    "Image Cache Budget (MB)",
+    value=int(st.secrets.get("FACE_IMAGE_CACHE_MB", 64)),
+    min_value=1,
+    max_value=2048
+)
+time_slices = st.sidebar.number_input(
+    "Time Slices",
+    value=1,
+    min_value=1,
+    max_value=64,
+    help="Split the date range into this many windows and fetch every event in them in parallel."
+)
+max_events_per_slice = st.sidebar.number_input("Max Events per Slice", value=1000, min_value=1, max_value=100000, disabled=time_slices == 1)
 search_clicked = st.sidebar.button("Search Face Events")
 
 if 'face_events' not in st.session_state:
     st.session_state['face_events'] = None
 if 'face_events_token' not in st.session_state:
     st.session_state['face_events_token'] = None
-if 'face_event_image_cache' not in st.session_state:
-        st.session_state['face_event_image_cache'] = {}    
+thumbnail_config = thumbnail_settings()
+image_cache = get_session_image_cache('face_event_image_cache', image_cache_mb * 1024 * 1024)
 
 if search_clicked:
     params = {
@@ -49,82 +65,82 @@ if search_clicked:
         "limit": limit,
         "eventTopics": "DEVICE_FACE_MATCH_START"
     }
-    with st.spinner("Fetching face events from server..."):
-        try:
-            resp = logged_request("get", f"{API_URL}/events-search", params=params)
-            resp.raise_for_status()
-            data = resp.json()
-            events = data['result']['events']
-            token = data['result'].get('token')
+    if time_slices > 1:
+        with st.spinner("Fetching face events by time window..."):
+            status = st.empty()
+            events, errors, capped = fetch_time_sliced_events(
+                API_URL, params,
+                datetime.combine(from_date, datetime.min.time()),
+                datetime.combine(to_date, datetime.min.time()),
+                time_slices, max_events_per_slice,
+                int(st.secrets.get("SEARCH_CONCURRENCY", 8)),
+                on_progress=lambda done, total: status.info(f"Searched {done}/{total} time windows...")
+            )
+            status.empty()
+            for (window_start, window_end), error in errors:
+                st.warning(f"Failed to fetch face events for {window_start} - {window_end}: {error}")
+            if capped:
+                st.warning(f"Stopped at {max_events_per_slice} events in {len(capped)} time windows, so these have gaps: "
+                           f"{', '.join(f'{s} - {e}' for s, e in capped)}. Raise Max Events per Slice or add more time slices.")
+            st.session_state['face_events'] = events or None
+            st.session_state['face_events_token'] = None
             if not events:
+                st.info("No face match events found for the given parameters.")
+    else:
+        with st.spinner("Fetching face events from server..."):
+            try:
+                resp = logged_request("get", f"{API_URL}/events-search", params=params)
+                resp.raise_for_status()
+                data = resp.json()
+                events = data['result']['events']
+                token = data['result'].get('token')
+                if not events:
+                    st.session_state['face_events'] = None
+                    st.session_state['face_events_token'] = None
+                    st.info("No face match events found for the given parameters.")
+                else:
+                    st.session_state['face_events'] = events
+                    st.session_state['face_events_token'] = token
+            except Exception as e:
                 st.session_state['face_events'] = None
                 st.session_state['face_events_token'] = None
-                st.info("No face match events found for the given parameters.")
-            else:
-                st.session_state['face_events'] = events
-                st.session_state['face_events_token'] = token
-        except Exception as e:
-            st.session_state['face_events'] = None
-            st.session_state['face_events_token'] = None
-            st.error(f"Failed to fetch face events: {e}")
+                st.error(f"Failed to fetch face events: {e}")
+
+def face_event_cache_key(event):
+    return f"{event.get('objectId')}_{event.get('thisId')}"
 
-def display_face_event_media(event, image_cache):
+def fetch_face_event_media(event):
     camera_id = event.get('cameraId')
     timestamp = event.get('timestamp')
-    objectId = event.get('objectId')
-    thisId = event.get('thisId')
     roi = event.get('faceRoi')
     if not (camera_id and timestamp and roi):
-        st.warning("Missing cameraId, timestamp, or faceRoi for media fetch.")
-        return None, None
-    cache_key = f"{objectId}_{thisId}"
-    if cache_key in image_cache:
-        image, cropped = image_cache[cache_key]
-    else:
-        params = {
-            'cameraId': camera_id,
-            't': timestamp,
-            'format': 'jpeg'
-        }
-        with st.spinner("Fetching and displaying image and ROI..."):
-            try:
-                media_resp = logged_request("get", f"{API_URL}/media", params=params)
-                media_resp.raise_for_status()
-                image = Image.open(io.BytesIO(media_resp.content))
-                # buffered = io.BytesIO()
-                # image.save(buffered, format="JPEG")
-                # img_b64 = base64.b64encode(buffered.getvalue()).decode()
-                width, height = image.size
-                left = int(roi['left'] * width)
-                top = int(roi['top'] * height)
-                right = int(roi['right'] * width)
-                bottom = int(roi['bottom'] * height)
-                cropped = image.crop((left, top, right, bottom))
-                # buffered = io.BytesIO()
-                # cropped.save(buffered, format="JPEG")
-                # cropped_b64 = base64.b64encode(buffered.getvalue()).decode()
-                image_cache[cache_key] = (image, cropped)
-            except Exception as e:
-                st.error(f"Failed to fetch/crop image: {e}")
-                return None, None
-    return image, cropped
-    # st.text_area("Base64 of Full Image", img_b64, height=150, key=f"full_img_b64_{thisId}")
-    # st.text_area("Base64 of Cropped Image", cropped_b64, height=150, key=f"cropped_img_b64_{thisId}")
+        raise ValueError("Missing cameraId, timestamp, or faceRoi for media fetch.")
+    return frame_thumbnails(fetch_media_frame(API_URL, camera_id, timestamp), roi, thumbnail_config)
 
-if st.session_state.get('face_events') is not None:
-    image_cache = st.session_state['face_event_image_cache']
-    for idx, event in enumerate(st.session_state['face_events']):
+def show_face_event_media(slots, image, cropped):
+    image_slot, cropped_slot = slots
+    image_slot.image(image, caption="Full Image")
+    cropped_slot.image(cropped, caption="Cropped ROI Image")
+
+@st.fragment
+def face_events_panel():
+    # Fragment: paging and Extend Search rerun only the event list, not the sidebar or API log.
+    events = st.session_state['face_events']
+    media_slots = {}
+    start, end = paginate(len(events), "face_events", default_page_size=20)
+    for idx in range(start, end):
+        event = events[idx]
         st.markdown(f"### Event {idx + 1}")
         cols = st.columns([3, 4, 1])
-        image, cropped = display_face_event_media(event, image_cache)
         with cols[0]:
             st.json(event)
-        with cols[1]:
-            if image is not None:
-                st.image(image, caption="Full Image")
-        with cols[2]:
-            if cropped is not None:
-                st.image(cropped, caption="Cropped ROI Image")
+        slots = (cols[1].empty(), cols[2].empty())
+        cached = image_cache.get(face_event_cache_key(event))
+        if cached is not None:
+            show_face_event_media(slots, *cached)
+        else:
+            slots[0].caption("Loading image...")
+            media_slots[idx] = slots
     if st.session_state.get('face_events_token'):
         if st.button("Extend Search", key="extend_face_search"):
             with st.spinner("Fetching more face events..."):
@@ -144,13 +160,34 @@ if st.session_state.get('face_events') is not None:
                             st.session_state['face_events_token'] = new_token
                         else:
                             st.session_state['face_events_token'] = None
-                        st.rerun()
+                        st.rerun(scope="fragment")
                     else:
                         st.session_state['face_events_token'] = None
                         st.info("No more face match events found.")
                 except Exception as e:
                     st.error(f"Failed to fetch more face events: {e}")
+    if media_slots:
+        pending_events = [(idx, events[idx]) for idx in media_slots]
+        progress = st.progress(0.0, text=f"Fetching media for {len(pending_events)} events...")
+        done = 0
+        for (idx, event), result, error in run_concurrently(
+            lambda item: fetch_face_event_media(item[1]), pending_events, media_concurrency
+        ):
+            done += 1
+            slots = media_slots[idx]
+            if error is not None:
+                slots[0].error(f"Failed to fetch/crop image: {error}")
+            else:
+                image_cache.put(face_event_cache_key(event), result)
+                show_face_event_media(slots, *result)
+            progress.progress(done / len(pending_events), text=f"Fetched media for {done}/{len(pending_events)} events")
+        progress.empty()
+
+if st.session_state.get('face_events') is not None:
+    face_events_panel()
 else:
     st.info("Fill in the parameters and click 'Search Face Events' to load data.")
 
+show_image_cache_stats(image_cache)
+
 global_page_setup()
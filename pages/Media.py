@@ -1,9 +1,12 @@
 import streamlit as st
-import json
 from utils.api_logger import logged_request
 from utils.setup import global_page_setup
+from utils.media_download import show_streamed_video
+from utils.ndjson import show_ndjson_media
+from utils.metrics import start_page_timer
 
 st.set_page_config(page_title="Media Fetcher", layout="wide")
+start_page_timer("Media")
 st.title("Avigilon Media Fetcher")
 
 API_BASE = st.secrets.get("API_BASE", "http://localhost:8000/api")
@@ -24,19 +27,13 @@ if st.sidebar.button("Fetch Media"):
         }
         with st.spinner("Fetching media from server..."):
             try:
-                resp = logged_request("get", f"{API_BASE}/media", params=params)
                 if format_option == "fmp4":
-                    st.video(resp.content)
+                    show_streamed_video(f"{API_BASE}/media", params)
                 elif format_option == "jpeg":
+                    resp = logged_request("get", f"{API_BASE}/media", params=params)
                     st.image(resp.content)
                 elif format_option == "json":
-                    try:
-                        ndjson_lines = resp.content.decode('utf-8').splitlines()
-                        for line in ndjson_lines:
-                            if line.strip():
-                                st.json(json.loads(line))
-                    except Exception:
-                        st.write(resp.content)
+                    show_ndjson_media(f"{API_BASE}/media", params)
             except Exception as e:
                 st.error(f"Failed to fetch media: {e}")
 
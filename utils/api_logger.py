@@ -1,23 +1,157 @@
 import streamlit as st
-import requests
 import json
+import time
+import weakref
+from collections import deque
+from utils.http_client import get_http_session, get_timeout
+from utils.metrics import record_request
+from utils.governor import get_governor, is_backend_failure
+from utils.pagination import paginate
+
+DEFAULT_LOG_CAPACITY = 200
 
 def ensure_log_state():
-    if 'api_logs' not in st.session_state:
-        st.session_state.api_logs = []
+    capacity = int(st.secrets.get("API_LOG_CAPACITY", DEFAULT_LOG_CAPACITY))
+    logs = st.session_state.get('api_logs')
+    if not isinstance(logs, deque) or logs.maxlen != capacity:
+        st.session_state.api_logs = deque(logs or [], maxlen=capacity)
+
+def log_streamed_body(resp, record, method, url, start, error):
+    # A streamed body is read after logged_request returns, so its bytes and full duration are
+    # logged when the caller closes the response (or it is garbage-collected). Content-Length
+    # would miss chunked responses.
+    raw = resp.raw
+    finished = []
+    def finish():
+        if finished:
+            return
+        finished.append(True)
+        record['latency_ms'] = (time.perf_counter() - start) * 1000
+        record['response_bytes'] = raw.tell()
+        record_request(method, url, record['latency_ms'], record['response_bytes'], record['status'], error)
+    close = resp.close
+    def log_and_close():
+        try:
+            finish()
+        finally:
+            close()
+    resp.close = log_and_close
+    weakref.finalize(resp, finish)
+
+def new_log_record(method, url, kwargs, log_json, attempt):
+    record = {
+        'time': time.time(),
+        'method': method.upper(),
+        'url': url,
+        'params': kwargs.get('params'),
+        'json': kwargs.get('json') if log_json is None else log_json,
+        'attempt': attempt,
+        'status': None,
+        'latency_ms': None,
+        'response_bytes': None,
+        'error': None
+    }
+    st.session_state.api_logs.append(record)
+    return record
 
-def logged_request(method, url, **kwargs):
+def logged_request(method, url, log_json=None, **kwargs):
+    # Duke-Backend calls go through the process-wide governor: per-class in-flight and rate limits,
+    # a circuit breaker, and jittered retries of transient GET failures. Each attempt is logged;
+    # log_json replaces the logged body for large payloads.
     ensure_log_state()
-    log = f"➡️ Request: {method.upper()} {url}\n"
-    if 'params' in kwargs:
-        log += f"🔸 Params: {json.dumps(kwargs['params'], indent=2)}\n"
-    if 'json' in kwargs:
-        log += f"🔸 JSON Body:\n{json.dumps(kwargs['json'], indent=2)}\n"
-    st.session_state.api_logs.append(log)
-    return requests.request(method, url, **kwargs)
+    kwargs.setdefault('timeout', get_timeout())
+    governor = get_governor()
+    limiter = governor.limiter_for(url)
+    attempt = 0
+    while True:
+        record = new_log_record(method, url, kwargs, log_json, attempt)
+        ticket = None
+        start = time.perf_counter()
+        try:
+            if limiter is not None:
+                ticket = limiter.acquire()
+            start = time.perf_counter()
+            resp = get_http_session().request(method, url, **kwargs)
+        except Exception as e:
+            record['latency_ms'] = (time.perf_counter() - start) * 1000
+            record['error'] = str(e)
+            record_request(method, url, record['latency_ms'], error=record['error'])
+            if ticket is None:
+                raise
+            limiter.release(ticket)
+            limiter.record_result(ticket, failed=True if is_backend_failure(error=e) else None)
+            delay = governor.retry_delay(method, attempt, error=e)
+            if delay is None:
+                raise
+        except BaseException:
+            # Streamlit's rerun/stop exceptions must not leak the slot or a half-open probe.
+            if ticket is not None:
+                limiter.release(ticket)
+                limiter.record_result(ticket, failed=None)
+            raise
+        else:
+            record['latency_ms'] = (time.perf_counter() - start) * 1000
+            record['status'] = resp.status_code
+            error = None if resp.ok else f"HTTP {resp.status_code}"
+            if kwargs.get('stream'):
+                log_streamed_body(resp, record, method, url, start, error)
+            else:
+                record['response_bytes'] = len(resp.content)
+                record_request(method, url, record['latency_ms'], record['response_bytes'], resp.status_code, error)
+            if ticket is None:
+                return resp
+            limiter.record_result(ticket, failed=is_backend_failure(resp))
+            delay = governor.retry_delay(method, attempt, resp=resp)
+            if delay is None:
+                if kwargs.get('stream'):
+                    limiter.release_on_close(ticket, resp)
+                else:
+                    limiter.release(ticket)
+                return resp
+            limiter.release(ticket)
+            resp.close()
+        limiter.record_retry()
+        time.sleep(delay)
+        attempt += 1
+
+def format_log_entry(record):
+    log = f"➡️ Request: {record['method']} {record['url']}\n"
+    if record['params']:
+        log += f"🔸 Params: {json.dumps(record['params'], indent=2, default=str)}\n"
+    if record['json'] is not None:
+        log += f"🔸 JSON Body:\n{json.dumps(record['json'], indent=2, default=str)}\n"
+    if record['error']:
+        log += f"❌ Error: {record['error']}\n"
+    elif record['status'] is not None:
+        log += f"⬅️ Status: {record['status']} ({record['response_bytes']} bytes)\n"
+    if record.get('attempt'):
+        log += f"🔁 Retry attempt {record['attempt']}\n"
+    if record['latency_ms'] is not None:
+        log += f"⏱️ Latency: {record['latency_ms']:.0f} ms\n"
+    return log
+
+def log_matches(record, text_filter, errors_only):
+    if errors_only and not (record['error'] or (record['status'] or 0) >= 400):
+        return False
+    return not text_filter or text_filter.lower() in record['url'].lower()
+
+@st.fragment
+def api_logs_panel():
+    # Fragment: filtering and paging the log reruns only the log, not the page it is on.
+    cols = st.columns([3, 1])
+    text_filter = cols[0].text_input("Filter by URL", key="api_log_filter")
+    errors_only = cols[1].checkbox("Errors only", key="api_log_errors_only")
+    # Newest first; only the visible page is formatted and drawn.
+    records = [r for r in reversed(list(st.session_state.api_logs)) if log_matches(r, text_filter, errors_only)]
+    if not records:
+        st.caption("No API requests logged.")
+        return
+    st.caption(f"{len(records)} of {len(st.session_state.api_logs)} logged requests (keeping the last {st.session_state.api_logs.maxlen})")
+    start, end = paginate(len(records), "api_log")
+    for record in records[start:end]:
+        st.code(format_log_entry(record), language="text")
 
 def show_api_logs():
     ensure_log_state()
     with st.expander("🛠 Show API Request Logs", expanded=True):
-        for log in st.session_state.api_logs:
-            st.code(log, language="text")
+        api_logs_panel()
@@ -0,0 +1,32 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+def _attach_script_run_ctx(ctx):
+    # Lets worker threads use st.session_state / logged_request like the script thread.
+    if ctx is not None:
+        add_script_run_ctx(threading.current_thread(), ctx)
+
+# Runs fn over items on a thread pool and yields (item, result, error) as each call finishes,
+# so pages can stream results into placeholders and one failure never blocks the rest.
+def run_concurrently(fn, items, max_workers):
+    items = list(items)
+    if not items:
+        return
+    ctx = get_script_run_ctx()
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, min(int(max_workers), len(items))),
+        initializer=_attach_script_run_ctx,
+        initargs=(ctx,)
+    )
+    try:
+        futures = {executor.submit(fn, item): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                yield item, future.result(), None
+            except Exception as e:
+                yield item, None, e
+    finally:
+        # A rerun can abandon the generator mid-way; don't block on the remaining work.
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,93 @@
+import streamlit as st
+
+# Columns that repeat a handful of values across a whole event pull.
+CATEGORY_COLUMNS = ['type', 'cameraId', 'originatingServerId', 'serverId', 'eventTopic', 'location']
+CATEGORY_MAX_RATIO = 0.5
+# The backend's own timestamp string, kept next to the parsed column so /media requests
+# send back exactly what the backend returned.
+RAW_TIMESTAMP_COLUMN = 'timestampRaw'
+
+def arrow_strings_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def flatten_events(events):
+    # Nested dicts become dotted columns, e.g. recordTriggerParams.x.
+    import pandas as pd
+    return pd.json_normalize(events)
+
+def is_low_cardinality(series):
+    try:
+        return series.nunique(dropna=True) <= max(1, len(series) * CATEGORY_MAX_RATIO)
+    except TypeError:
+        # Columns holding lists are unhashable and stay as objects.
+        return False
+
+def compact_events_frame(df, arrow_strings=None):
+    import pandas as pd
+    if arrow_strings is None:
+        arrow_strings = bool(st.secrets.get("EVENTS_ARROW_STRINGS", False)) and arrow_strings_available()
+    if 'timestamp' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['timestamp']):
+        raw = df['timestamp'].astype(object)
+        if RAW_TIMESTAMP_COLUMN in df.columns:
+            # Rows appended to an already compacted frame only have the string in 'timestamp'.
+            raw = df[RAW_TIMESTAMP_COLUMN].astype(object).where(df[RAW_TIMESTAMP_COLUMN].notna(), raw)
+        df[RAW_TIMESTAMP_COLUMN] = raw
+        df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce', utc=True)
+    for col in df.columns:
+        # pandas >= 3 infers a dedicated string dtype instead of object for text columns.
+        if not (df[col].dtype == object or isinstance(df[col].dtype, pd.StringDtype)):
+            continue
+        if col != RAW_TIMESTAMP_COLUMN and (col in CATEGORY_COLUMNS or is_low_cardinality(df[col])):
+            try:
+                df[col] = df[col].astype('category')
+                continue
+            except TypeError:
+                pass
+        if arrow_strings and df[col].dtype != 'string[pyarrow]' and pd.api.types.infer_dtype(df[col], skipna=True) == 'string':
+            df[col] = df[col].astype('string[pyarrow]')
+    return df
+
+def events_frame(chunks):
+    import pandas as pd
+    return compact_events_frame(pd.concat(chunks, ignore_index=True))
+
+def append_events_frame(df, new_df):
+    # pd.concat drops the category dtype when the two sides have different categories, so
+    # align them first; appending a few rows then never re-compacts the whole frame.
+    import pandas as pd
+    new_df = new_df.copy(deep=False)
+    df = df.copy(deep=False)
+    for col in df.columns.intersection(new_df.columns):
+        if not isinstance(df[col].dtype, pd.CategoricalDtype):
+            continue
+        if not isinstance(new_df[col].dtype, pd.CategoricalDtype):
+            try:
+                new_df[col] = new_df[col].astype('category')
+            except TypeError:
+                continue
+        categories = df[col].cat.categories.union(new_df[col].cat.categories)
+        if not categories.equals(df[col].cat.categories):
+            df[col] = df[col].cat.set_categories(categories)
+        new_df[col] = new_df[col].cat.set_categories(categories)
+    return pd.concat([df, new_df], ignore_index=True)
+
+def to_api_timestamp(value):
+    # The backend expects the same ISO form it returned, e.g. 2025-06-01T12:00:00.000Z.
+    import pandas as pd
+    if pd.isna(value):
+        raise ValueError("Event has no parseable timestamp.")
+    if isinstance(value, pd.Timestamp):
+        return value.tz_convert('UTC').strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+    return value
+
+def event_api_timestamp(df, position):
+    # Prefer the backend's original string over re-formatting the parsed value.
+    if RAW_TIMESTAMP_COLUMN in df.columns:
+        raw = df[RAW_TIMESTAMP_COLUMN].iloc[position]
+        if isinstance(raw, str) and raw:
+            return raw
+    return to_api_timestamp(df['timestamp'].iloc[position])
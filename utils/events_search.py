@@ -0,0 +1,93 @@
+import heapq
+from utils.api_logger import logged_request
+from utils.concurrency import run_concurrently
+
+def fetch_events_page(api_url, params):
+    resp = logged_request("get", f"{api_url}/events-search", params=params)
+    resp.raise_for_status()
+    result = resp.json().get('result', {})
+    return result.get('events', []), result.get('token')
+
+# Yields (events, token) for each page, following CONTINUE tokens until the server returns
+# no events, no token, or the same token again. The token yielded with the last page is None
+# once the search is exhausted, so callers can resume from whatever token they stopped at.
+def iter_event_pages(api_url, params):
+    events, token = fetch_events_page(api_url, params)
+    while events:
+        next_params = {"query_type": "CONTINUE", "token": token} if token else None
+        yield events, token
+        if next_params is None:
+            return
+        events, new_token = fetch_events_page(api_url, next_params)
+        if new_token == token:
+            new_token = None
+        token = new_token
+
+def event_timestamp(event):
+    # Avigilon timestamps share one ISO-8601 UTC format, so they order correctly as strings.
+    return event.get('timestamp') or ''
+
+def fetch_all_events(api_url, params, max_rows):
+    events = []
+    for page, _ in iter_event_pages(api_url, params):
+        events.extend(page)
+        if len(events) >= max_rows:
+            break
+    return events
+
+# k-way merges per-server event lists into one ascending timestamp order with a heap.
+# Each stream is expected to already be ordered (either direction); unordered ones are sorted first.
+def merge_by_timestamp(streams):
+    ascending_streams = []
+    for events in streams:
+        keys = [event_timestamp(e) for e in events]
+        if all(a <= b for a, b in zip(keys, keys[1:])):
+            ascending_streams.append(events)
+        elif all(a >= b for a, b in zip(keys, keys[1:])):
+            ascending_streams.append(events[::-1])
+        else:
+            ascending_streams.append(sorted(events, key=event_timestamp))
+    return heapq.merge(*ascending_streams, key=event_timestamp)
+
+def format_api_time(value):
+    return value.strftime('%Y-%m-%dT%H:%M:%S.') + f"{value.microsecond // 1000:03d}Z"
+
+def split_time_range(start, end, slices):
+    step = (end - start) / slices
+    bounds = [start + step * i for i in range(slices)] + [end]
+    return [(format_api_time(a), format_api_time(b)) for a, b in zip(bounds, bounds[1:])]
+
+def dedupe_events(events):
+    seen = set()
+    for event in events:
+        event_id = event.get('thisId')
+        if event_id is not None:
+            if event_id in seen:
+                continue
+            seen.add(event_id)
+        yield event
+
+# Splits a TIME_RANGE query into sub-windows that are drained in parallel, each following its own
+# continuation chain. Results are concatenated in window order and de-duplicated by thisId, since
+# events on a shared boundary can come back from both neighbouring windows.
+def fetch_time_sliced_events(api_url, params, start, end, slices, max_rows, concurrency, on_progress=None):
+    windows = list(enumerate(split_time_range(start, end, slices)))
+    by_window = {}
+    errors = []
+    capped = []
+    for (position, window), events, error in run_concurrently(
+        lambda item: fetch_all_events(api_url, {**params, "from_time": item[1][0], "to_time": item[1][1]}, max_rows),
+        windows,
+        concurrency
+    ):
+        if error is not None:
+            errors.append((window, error))
+        else:
+            by_window[position] = events
+            if len(events) >= max_rows:
+                # A capped window leaves a gap inside the range, so callers must report it.
+                capped.append(window)
+        if on_progress is not None:
+            on_progress(len(by_window) + len(errors), len(windows))
+    ordered = (event for position in sorted(by_window) for event in by_window[position])
+    return list(dedupe_events(ordered)), errors, sorted(capped)
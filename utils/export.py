@@ -0,0 +1,114 @@
+import json
+import os
+import time
+from utils.api_logger import logged_request
+from utils.concurrency import run_concurrently
+from utils.events_search import iter_event_pages
+from utils.events_frame import arrow_strings_available
+
+EXPORT_FORMATS = {"NDJSON": ".ndjson", "Parquet": ".parquet"}
+RECORD_COLUMN = "record"
+
+def iter_appearance_pages(endpoint, payload):
+    token = None
+    while True:
+        resp = logged_request("post", endpoint, json=payload if token is None else {"token": token})
+        resp.raise_for_status()
+        result = resp.json().get('result', {})
+        results = result.get('results') or []
+        if not results:
+            return
+        new_token = result.get('token')
+        yield results
+        if not new_token or new_token == token:
+            return
+        token = new_token
+
+def iter_search_records(source, api_url, params):
+    if source == "events-search":
+        for events, _ in iter_event_pages(api_url, params):
+            yield from events
+    else:
+        for results in iter_appearance_pages(f"{api_url}/{source}", params):
+            yield from results
+
+def available_export_formats():
+    # pandas needs pyarrow to write Parquet.
+    return [f for f in EXPORT_FORMATS if f != "Parquet" or arrow_strings_available()]
+
+def write_chunk(records, path, export_format):
+    import pandas as pd
+    if export_format == "Parquet":
+        # One JSON document per row: flattening would turn nested objects into dotted keys, fill
+        # missing fields with nulls and ints with floats, so replays would not match the originals.
+        pd.DataFrame({RECORD_COLUMN: [json.dumps(record) for record in records]}).to_parquet(path, index=False)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record))
+                f.write("\n")
+
+# Streams search results straight to numbered chunk files of chunk_rows records each, so only one
+# chunk is ever held in memory. Yields (files_written, records_written) after every chunk.
+def export_records(records, out_dir, prefix, export_format, chunk_rows, max_records=None):
+    os.makedirs(out_dir, exist_ok=True)
+    suffix = EXPORT_FORMATS[export_format]
+    chunk = []
+    files = 0
+    written = 0
+    for record in records:
+        chunk.append(record)
+        if max_records and written + len(chunk) >= max_records:
+            break
+        if len(chunk) >= chunk_rows:
+            files += 1
+            write_chunk(chunk, os.path.join(out_dir, f"{prefix}_{files:05d}{suffix}"), export_format)
+            written += len(chunk)
+            chunk = []
+            yield files, written
+    if chunk:
+        files += 1
+        write_chunk(chunk, os.path.join(out_dir, f"{prefix}_{files:05d}{suffix}"), export_format)
+        written += len(chunk)
+        yield files, written
+
+def list_chunk_files(directory):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if os.path.splitext(name)[1] in EXPORT_FORMATS.values()
+    )
+
+def read_chunk(path):
+    import pandas as pd
+    if path.endswith(".parquet"):
+        return [json.loads(record) for record in pd.read_parquet(path, columns=[RECORD_COLUMN])[RECORD_COLUMN]]
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def post_batch(ingest_url, batch):
+    # Pre-serialised so the API log keeps a small summary instead of a reference to every batch.
+    body = json.dumps(batch).encode()
+    resp = logged_request("post", ingest_url, data=body, headers={"Content-Type": "application/json"},
+                          log_json={"records": len(batch), "bytes": len(body)})
+    resp.raise_for_status()
+    return len(batch)
+
+# POSTs every chunk file to ingest_url in batches with bounded concurrency, one chunk in memory at
+# a time. Yields a running summary after every batch for throughput reporting.
+def replay_chunks(paths, ingest_url, batch_size, concurrency):
+    stats = {'records': 0, 'batches': 0, 'failed_batches': 0, 'last_error': None, 'elapsed_s': 0.0}
+    start = time.perf_counter()
+    for path in paths:
+        records = read_chunk(path)
+        batches = [records[i:i + batch_size] for i in range(0, len(records), batch_size)]
+        for _, sent, error in run_concurrently(lambda batch: post_batch(ingest_url, batch), batches, concurrency):
+            stats['batches'] += 1
+            if error is not None:
+                stats['failed_batches'] += 1
+                stats['last_error'] = str(error)
+            else:
+                stats['records'] += sent
+            stats['elapsed_s'] = time.perf_counter() - start
+            yield stats
@@ -0,0 +1,79 @@
+import streamlit as st
+import threading
+from concurrent.futures import Future
+from utils.api_logger import logged_request
+from utils.image_cache import ByteBudgetLRUCache
+
+DEFAULT_FRAME_CACHE_MB = 256
+
+class SharedFrameCache:
+    # Process-wide /media frame cache keyed by (cameraId, t, format). Concurrent requests for the
+    # same key, from any session, share one in-flight download instead of each hitting the backend.
+    def __init__(self, max_bytes):
+        self._lock = threading.Lock()
+        self._store = ByteBudgetLRUCache(max_bytes)
+        self._inflight = {}
+        self.coalesced = 0
+
+    def get_or_fetch(self, key, fetch):
+        with self._lock:
+            data = self._store.get(key)
+            if data is not None:
+                return data
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result()
+        # BaseException too: a Streamlit rerun/stop inside fetch() must still resolve the future,
+        # or every later request for this frame would wait on it forever. Waiters from other
+        # sessions get a plain error rather than this session's rerun/stop signal.
+        try:
+            data = fetch()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e if isinstance(e, Exception) else RuntimeError("Frame download was interrupted; retry."))
+            raise
+        with self._lock:
+            self._store.put(key, data)
+            self._inflight.pop(key, None)
+        future.set_result(data)
+        return data
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._store),
+                'bytes': self._store.current_bytes,
+                'max_bytes': self._store.max_bytes,
+                'hits': self._store.hits,
+                'misses': self._store.misses,
+                'coalesced': self.coalesced,
+                'evictions': self._store.evictions,
+                'in_flight': len(self._inflight)
+            }
+
+    def clear(self):
+        with self._lock:
+            self._store.clear()
+
+@st.cache_resource
+def get_frame_cache():
+    return SharedFrameCache(int(st.secrets.get("FRAME_CACHE_MB", DEFAULT_FRAME_CACHE_MB)) * 1024 * 1024)
+
+def fetch_media_frame(api_url, camera_id, timestamp, media_format='jpeg'):
+    def fetch():
+        params = {
+            'cameraId': camera_id,
+            't': timestamp,
+            'format': media_format
+        }
+        media_resp = logged_request("get", f"{api_url}/media", params=params)
+        media_resp.raise_for_status()
+        return media_resp.content
+    return get_frame_cache().get_or_fetch((camera_id, timestamp, media_format), fetch)
@@ -0,0 +1,286 @@
+import streamlit as st
+import random
+import threading
+import time
+import weakref
+from urllib.parse import urlparse
+from requests.exceptions import RequestException, ConnectionError, Timeout
+
+ENDPOINT_CLASSES = ['search', 'media', 'other']
+DEFAULT_CONCURRENCY = {'search': 8, 'media': 16, 'other': 8}
+DEFAULT_RATE = {'search': 20, 'media': 50, 'other': 20}
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BACKOFF_SECONDS = 0.25
+DEFAULT_BACKOFF_MAX_SECONDS = 5
+DEFAULT_BREAKER_FAILURES = 5
+DEFAULT_BREAKER_COOLDOWN = 30
+DEFAULT_QUEUE_TIMEOUT = 30
+RETRY_STATUSES = {429, 502, 503, 504}
+DEFAULT_API_BASE = "http://localhost:8000/api"
+
+class CircuitOpenError(RequestException):
+    pass
+
+class LimiterTimeoutError(RequestException):
+    pass
+
+def backend_bases():
+    return {st.secrets.get("API_URL", DEFAULT_API_BASE).rstrip('/'), st.secrets.get("API_BASE", DEFAULT_API_BASE).rstrip('/')}
+
+def is_backend_url(url):
+    # Other hosts, e.g. the Duke-Central ingestion endpoint used by replays, are not governed:
+    # their load should be measured as configured, and their failures must not open the
+    # breakers that guard Duke-Backend.
+    return any(url == base or url.startswith(base + '/') for base in backend_bases())
+
+def class_concurrency(name):
+    return int(st.secrets.get(f"GOVERNOR_{name.upper()}_CONCURRENCY", DEFAULT_CONCURRENCY[name]))
+
+def total_concurrency():
+    # Most requests the governor lets in flight to Duke-Backend at once, across all classes.
+    return sum(class_concurrency(name) for name in ENDPOINT_CLASSES)
+
+def endpoint_class(url):
+    path = urlparse(url).path
+    if path.endswith('/media'):
+        return 'media'
+    if 'search' in path:
+        return 'search'
+    return 'other'
+
+def is_backend_failure(resp=None, error=None):
+    # Only signs of an unhealthy or overloaded backend count towards opening the breaker.
+    if error is not None:
+        return isinstance(error, (ConnectionError, Timeout)) and not isinstance(error, (CircuitOpenError, LimiterTimeoutError))
+    return resp.status_code >= 500 or resp.status_code == 429
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, deadline):
+        # rate <= 0 disables rate limiting for the class.
+        if self.rate <= 0:
+            return True
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def available(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            return self.tokens
+
+class EndpointLimiter:
+    # In-flight cap, token bucket and circuit breaker for one endpoint class, shared by every session.
+    def __init__(self, name, concurrency, rate, breaker_failures, breaker_cooldown, queue_timeout):
+        self.name = name
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate, max(1, rate))
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown = breaker_cooldown
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+        self.requests = 0
+        self.retries = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.breaker_trips = 0
+
+    def _admit(self):
+        # Closed: everything passes. Open: reject until the cooldown ends, then let one probe
+        # through (half-open); its result decides whether the breaker closes or re-opens.
+        with self._lock:
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.breaker_cooldown:
+                self.state = 'half_open'
+            if self.state == 'open' or (self.state == 'half_open' and self._probe_in_flight):
+                self.rejected += 1
+                return None
+            probe = self.state == 'half_open'
+            if probe:
+                self._probe_in_flight = True
+            return {'admitted_at': time.monotonic(), 'probe': probe, 'released': False}
+
+    def acquire(self):
+        # Returns a ticket for release() and record_result(); raises instead of waiting forever.
+        ticket = self._admit()
+        if ticket is None:
+            raise CircuitOpenError(f"Circuit open for {self.name} requests; Duke-Backend is failing, retrying after {self.breaker_cooldown:.0f}s")
+        deadline = time.monotonic() + self.queue_timeout
+        with self._lock:
+            self.waiting += 1
+        try:
+            acquired = self._slots.acquire(timeout=self.queue_timeout)
+            if acquired and not self.bucket.acquire(deadline):
+                self._slots.release()
+                acquired = False
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        if not acquired:
+            with self._lock:
+                self.throttled += 1
+                if ticket['probe']:
+                    self._probe_in_flight = False
+            raise LimiterTimeoutError(f"Timed out after {self.queue_timeout:.0f}s waiting for a {self.name} request slot")
+        with self._lock:
+            self.in_flight += 1
+            self.requests += 1
+        return ticket
+
+    def release(self, ticket):
+        # Idempotent, so a streamed response can release on close and again on garbage collection.
+        with self._lock:
+            if ticket['released']:
+                return
+            ticket['released'] = True
+            self.in_flight -= 1
+        self._slots.release()
+
+    def release_on_close(self, ticket, resp):
+        # Streamed bodies keep their in-flight slot until the caller closes the response.
+        close = resp.close
+        def close_and_release():
+            try:
+                close()
+            finally:
+                self.release(ticket)
+        resp.close = close_and_release
+        weakref.finalize(resp, self.release, ticket)
+
+    def record_result(self, ticket, failed):
+        # failed is None for errors that say nothing about backend health.
+        with self._lock:
+            if ticket['probe']:
+                self._probe_in_flight = False
+            # A slow request admitted before the breaker opened must not close or re-open it.
+            if failed is None or (self.opened_at is not None and ticket['admitted_at'] < self.opened_at):
+                return
+            if not failed:
+                self.consecutive_failures = 0
+                self.state = 'closed'
+                return
+            self.consecutive_failures += 1
+            if self.state == 'half_open' or (self.state == 'closed' and self.consecutive_failures >= self.breaker_failures):
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+                self.breaker_trips += 1
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def reset(self):
+        with self._lock:
+            self.state = 'closed'
+            self.consecutive_failures = 0
+            self.opened_at = None
+
+    def stats(self):
+        with self._lock:
+            reopens_in = None
+            if self.state == 'open':
+                reopens_in = max(0.0, self.breaker_cooldown - (time.monotonic() - self.opened_at))
+            return {
+                'class': self.name,
+                'state': self.state,
+                'in_flight': self.in_flight,
+                'max_in_flight': self.concurrency,
+                'waiting': self.waiting,
+                'tokens': round(self.bucket.available(), 1),
+                'rate_per_s': self.bucket.rate,
+                'requests': self.requests,
+                'retries': self.retries,
+                'throttled': self.throttled,
+                'rejected': self.rejected,
+                'failures': self.consecutive_failures,
+                'trips': self.breaker_trips,
+                'reopens_in_s': None if reopens_in is None else round(reopens_in, 1)
+            }
+
+class BackendGovernor:
+    def __init__(self, limiters, max_retries, backoff, backoff_max):
+        self.limiters = limiters
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+
+    def limiter_for(self, url):
+        if not is_backend_url(url):
+            return None
+        return self.limiters[endpoint_class(url)]
+
+    def retry_delay(self, method, attempt, resp=None, error=None):
+        # Only idempotent GETs are retried, and only for transient failures.
+        if method.upper() != 'GET' or attempt >= self.max_retries:
+            return None
+        if error is not None and not is_backend_failure(error=error):
+            return None
+        if resp is not None and resp.status_code not in RETRY_STATUSES:
+            return None
+        retry_after = resp.headers.get('Retry-After') if resp is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        # Full jitter keeps retries from many sessions from arriving in lockstep.
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+
+    def stats(self):
+        return [self.limiters[name].stats() for name in ENDPOINT_CLASSES]
+
+    def reset_breakers(self):
+        for limiter in self.limiters.values():
+            limiter.reset()
+
+@st.cache_resource
+def get_governor():
+    breaker_failures = int(st.secrets.get("GOVERNOR_BREAKER_FAILURES", DEFAULT_BREAKER_FAILURES))
+    breaker_cooldown = float(st.secrets.get("GOVERNOR_BREAKER_COOLDOWN", DEFAULT_BREAKER_COOLDOWN))
+    queue_timeout = float(st.secrets.get("GOVERNOR_QUEUE_TIMEOUT", DEFAULT_QUEUE_TIMEOUT))
+    limiters = {}
+    for name in ENDPOINT_CLASSES:
+        concurrency = class_concurrency(name)
+        rate = float(st.secrets.get(f"GOVERNOR_{name.upper()}_RATE", DEFAULT_RATE[name]))
+        limiters[name] = EndpointLimiter(name, concurrency, rate, breaker_failures, breaker_cooldown, queue_timeout)
+    return BackendGovernor(
+        limiters,
+        int(st.secrets.get("GOVERNOR_MAX_RETRIES", DEFAULT_MAX_RETRIES)),
+        float(st.secrets.get("GOVERNOR_BACKOFF_SECONDS", DEFAULT_BACKOFF_SECONDS)),
+        float(st.secrets.get("GOVERNOR_BACKOFF_MAX_SECONDS", DEFAULT_BACKOFF_MAX_SECONDS))
+    )
+
+def show_governor_status():
+    governor = get_governor()
+    stats = governor.stats()
+    open_classes = [s['class'] for s in stats if s['state'] != 'closed']
+    if open_classes:
+        st.sidebar.warning(f"Duke-Backend circuit open for {', '.join(open_classes)} requests.")
+    with st.sidebar.expander("🚦 Backend Limiter", expanded=bool(open_classes)):
+        for s in stats:
+            reopens = f", retry in {s['reopens_in_s']}s" if s['reopens_in_s'] is not None else ""
+            st.caption(f"**{s['class']}**: {s['state']}{reopens} · {s['in_flight']}/{s['max_in_flight']} in flight, "
+                       f"{s['waiting']} waiting · {s['retries']} retries, {s['rejected']} rejected")
+        if st.button("Reset Circuit Breakers", key="reset_circuit_breakers"):
+            governor.reset_breakers()
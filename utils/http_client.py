@@ -0,0 +1,27 @@
+import streamlit as st
+import requests
+from requests.adapters import HTTPAdapter
+from utils.governor import total_concurrency
+
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 60
+
+def get_timeout():
+    connect_timeout = float(st.secrets.get("HTTP_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT))
+    read_timeout = float(st.secrets.get("HTTP_READ_TIMEOUT", DEFAULT_READ_TIMEOUT))
+    return (connect_timeout, read_timeout)
+
+@st.cache_resource
+def get_http_session():
+    # One keep-alive connection pool per process, shared by every page and session. It defaults to
+    # the governor's total in-flight cap so no governed request opens a connection it must discard.
+    pool_size = int(st.secrets.get("HTTP_POOL_SIZE", total_concurrency()))
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({
+        "Accept-Encoding": "gzip",
+        "Connection": "keep-alive"
+    })
+    return session
@@ -0,0 +1,70 @@
+import streamlit as st
+from collections import OrderedDict
+
+class ByteBudgetLRUCache:
+    # LRU cache of encoded image bytes, bounded by total payload size rather than entry count.
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        if key not in self._entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return self._entries[key][0]
+
+    def put(self, key, value, size=None):
+        if size is None:
+            size = sum(len(part) for part in value) if isinstance(value, tuple) else len(value)
+        if key in self._entries:
+            self.current_bytes -= self._entries.pop(key)[1]
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, size)
+        self.current_bytes += size
+        self._evict()
+
+    def resize(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.current_bytes -= size
+            self.evictions += 1
+
+def get_session_image_cache(state_key, max_bytes):
+    cache = st.session_state.get(state_key)
+    if not isinstance(cache, ByteBudgetLRUCache):
+        cache = ByteBudgetLRUCache(max_bytes)
+        st.session_state[state_key] = cache
+    elif cache.max_bytes != max_bytes:
+        cache.resize(max_bytes)
+    return cache
+
+def show_image_cache_stats(cache, label="Image Cache"):
+    with st.sidebar.expander(label):
+        st.write(f"{len(cache)} entries, {cache.current_bytes / 1e6:.1f} / {cache.max_bytes / 1e6:.0f} MB")
+        cols = st.columns(3)
+        cols[0].metric("Hits", cache.hits)
+        cols[1].metric("Misses", cache.misses)
+        cols[2].metric("Evictions", cache.evictions)
+        if st.button("Clear Cache", key=f"clear_{label}"):
+            cache.clear()
@@ -0,0 +1,58 @@
+import streamlit as st
+import io
+
+DEFAULT_PREVIEW_MAX_PX = 640
+DEFAULT_CROP_MAX_PX = 256
+DEFAULT_THUMBNAIL_QUALITY = 80
+
+def thumbnail_settings():
+    return {
+        'preview_max_px': int(st.secrets.get("THUMBNAIL_PREVIEW_MAX_PX", DEFAULT_PREVIEW_MAX_PX)),
+        'crop_max_px': int(st.secrets.get("THUMBNAIL_CROP_MAX_PX", DEFAULT_CROP_MAX_PX)),
+        'quality': int(st.secrets.get("THUMBNAIL_QUALITY", DEFAULT_THUMBNAIL_QUALITY))
+    }
+
+def encode_jpeg(image, quality):
+    buffered = io.BytesIO()
+    image.convert("RGB").save(buffered, format="JPEG", quality=quality)
+    return buffered.getvalue()
+
+def make_thumbnail(image, max_px, quality):
+    image = image.copy()
+    image.thumbnail((max_px, max_px))
+    return encode_jpeg(image, quality)
+
+def make_preview(jpeg_bytes, max_px, quality):
+    # JPEG draft mode lets libjpeg decode at 1/2, 1/4 or 1/8 scale instead of full resolution.
+    from PIL import Image
+    image = Image.open(io.BytesIO(jpeg_bytes))
+    image.draft("RGB", (max_px, max_px))
+    image.thumbnail((max_px, max_px))
+    return encode_jpeg(image, quality)
+
+def crop_roi(image, roi):
+    width, height = image.size
+    left = int(roi['left'] * width)
+    top = int(roi['top'] * height)
+    right = int(roi['right'] * width)
+    bottom = int(roi['bottom'] * height)
+    return image.crop((left, top, right, bottom))
+
+# Returns (preview_bytes, crop_bytes): a reduced-scale preview of the whole frame and a thumbnail
+# of the ROI cut from the full-resolution decode, both re-encoded for the browser.
+def frame_thumbnails(jpeg_bytes, roi, settings):
+    from PIL import Image
+    preview = make_preview(jpeg_bytes, settings['preview_max_px'], settings['quality'])
+    cropped = crop_roi(Image.open(io.BytesIO(jpeg_bytes)), roi)
+    return preview, make_thumbnail(cropped, settings['crop_max_px'], settings['quality'])
+
+def crop_jpeg(jpeg_bytes, roi, quality):
+    from PIL import Image
+    return encode_jpeg(crop_roi(Image.open(io.BytesIO(jpeg_bytes)), roi), quality)
+
+def roi_thumbnails(jpeg_bytes, rois, settings):
+    # Decodes the frame once and cuts every ROI from it.
+    from PIL import Image
+    image = Image.open(io.BytesIO(jpeg_bytes))
+    image.load()
+    return [make_thumbnail(crop_roi(image, roi), settings['crop_max_px'], settings['quality']) for roi in rois]
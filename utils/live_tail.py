@@ -0,0 +1,61 @@
+from collections import deque
+from utils.events_frame import flatten_events, compact_events_frame, append_events_frame
+
+# ACTIVE polls keep returning the same events, so thisIds are remembered well beyond the rows
+# kept for display; otherwise every evicted row would come back as "new" on the next poll.
+SEEN_ID_FACTOR = 10
+
+class LiveTailBuffer:
+    # Rolling window of the most recent events, kept as one compacted frame so each poll only
+    # normalises its new rows. De-duplicated by thisId through a bounded seen-id index.
+    def __init__(self, retention):
+        self.retention = retention
+        self.frame = None
+        self.seen = set()
+        self._seen_order = deque()
+        self.polls = 0
+        self.evicted = 0
+        self.last_new = 0
+
+    def __len__(self):
+        return 0 if self.frame is None else len(self.frame)
+
+    def _remember(self, event_id):
+        self.seen.add(event_id)
+        self._seen_order.append(event_id)
+        self._forget()
+
+    def _forget(self):
+        while len(self._seen_order) > self.retention * SEEN_ID_FACTOR:
+            self.seen.discard(self._seen_order.popleft())
+
+    def add(self, events):
+        fresh = []
+        for event in events:
+            event_id = event.get('thisId')
+            if event_id is not None:
+                if event_id in self.seen:
+                    continue
+                self._remember(event_id)
+            fresh.append(event)
+        if fresh:
+            new_frame = compact_events_frame(flatten_events(fresh))
+            self.frame = new_frame if self.frame is None else append_events_frame(self.frame, new_frame)
+        self._evict()
+        self.polls += 1
+        self.last_new = len(fresh)
+        return len(fresh)
+
+    def newest_first(self):
+        return self.frame.iloc[::-1]
+
+    def resize(self, retention):
+        self.retention = retention
+        self._evict()
+        self._forget()
+
+    def _evict(self):
+        overflow = len(self) - self.retention
+        if overflow > 0:
+            self.frame = self.frame.iloc[overflow:].reset_index(drop=True)
+            self.evicted += overflow
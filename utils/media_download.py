@@ -0,0 +1,53 @@
+import streamlit as st
+import os
+import tempfile
+import time
+from utils.api_logger import logged_request
+
+DEFAULT_MAX_DOWNLOAD_MB = 500
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+
+def max_download_bytes():
+    return int(st.secrets.get("MEDIA_MAX_DOWNLOAD_MB", DEFAULT_MAX_DOWNLOAD_MB)) * 1024 * 1024
+
+# Streams a /media response to a temp file on disk, enforcing max_bytes and reporting progress
+# and transfer rate, so long clips never sit in memory as a single bytes object.
+def download_media_to_file(url, params, max_bytes, progress_slot, suffix=".mp4"):
+    resp = logged_request("get", url, params=params, stream=True)
+    with resp:
+        resp.raise_for_status()
+        total = int(resp.headers.get('Content-Length') or 0)
+        if total > max_bytes:
+            raise ValueError(f"Media is {total / 1e6:.1f} MB, above the {max_bytes / 1e6:.0f} MB limit.")
+        fd, path = tempfile.mkstemp(prefix="duke_media_", suffix=suffix)
+        downloaded = 0
+        start = time.perf_counter()
+        completed = False
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in resp.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+                    downloaded += len(chunk)
+                    if downloaded > max_bytes:
+                        raise ValueError(f"Download exceeded the {max_bytes / 1e6:.0f} MB limit.")
+                    f.write(chunk)
+                    rate = downloaded / max(time.perf_counter() - start, 1e-6) / 1e6
+                    text = f"Downloaded {downloaded / 1e6:.1f} MB at {rate:.1f} MB/s"
+                    fraction = min(downloaded / total, 1.0) if total else (downloaded % (10 * DOWNLOAD_CHUNK_BYTES)) / (10 * DOWNLOAD_CHUNK_BYTES)
+                    progress_slot.progress(fraction, text=text)
+            completed = True
+        finally:
+            # Also covers Streamlit's rerun/stop exceptions, which are BaseExceptions raised
+            # from progress_slot when a widget changes mid-download.
+            if not completed:
+                os.remove(path)
+    return path
+
+def show_streamed_video(url, params):
+    progress_slot = st.empty()
+    path = download_media_to_file(url, params, max_download_bytes(), progress_slot)
+    try:
+        progress_slot.empty()
+        # st.video copies the file into Streamlit's media store, so the temp file can go right away.
+        st.video(path, format="video/mp4")
+    finally:
+        os.remove(path)
@@ -0,0 +1,63 @@
+import streamlit as st
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+DEFAULT_METRICS_CAPACITY = 5000
+
+class MetricsStore:
+    # Process-wide, thread-safe ring buffer of timing samples shared by every session.
+    def __init__(self, capacity):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=capacity)
+
+    def record(self, kind, name, latency_ms, response_bytes=0, status=None, error=None):
+        sample = {
+            'time': time.time(),
+            'kind': kind,
+            'name': name,
+            'latency_ms': latency_ms,
+            'bytes': response_bytes or 0,
+            'status': status,
+            'error': error
+        }
+        with self._lock:
+            self._samples.append(sample)
+
+    def samples(self):
+        with self._lock:
+            return list(self._samples)
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+@st.cache_resource
+def get_metrics_store():
+    return MetricsStore(int(st.secrets.get("METRICS_CAPACITY", DEFAULT_METRICS_CAPACITY)))
+
+def endpoint_name(method, url):
+    return f"{method.upper()} {urlparse(url).path}"
+
+def record_request(method, url, latency_ms, response_bytes=0, status=None, error=None):
+    get_metrics_store().record('request', endpoint_name(method, url), latency_ms, response_bytes, status, error)
+
+def start_page_timer(page_name):
+    st.session_state['_page_timer'] = (page_name, time.perf_counter())
+
+def record_first_paint():
+    # Time until the whole page has been drawn once, before waiting on any background data.
+    # Only a session's first run of each page counts; later reruns are recorded as page renders.
+    timer = st.session_state.get('_page_timer')
+    painted = st.session_state.setdefault('_painted_pages', set())
+    if timer is not None and timer[0] not in painted:
+        page_name, start = timer
+        painted.add(page_name)
+        get_metrics_store().record('first_paint', page_name, (time.perf_counter() - start) * 1000)
+
+def record_page_render():
+    timer = st.session_state.pop('_page_timer', None)
+    if timer is not None:
+        page_name, start = timer
+        get_metrics_store().record('page', page_name, (time.perf_counter() - start) * 1000)
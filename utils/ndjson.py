@@ -0,0 +1,61 @@
+import streamlit as st
+import json
+from utils.api_logger import logged_request
+
+NDJSON_BATCH_SIZE = 500
+RAW_PREVIEW_RECORDS = 100
+NDJSON_READ_CHUNK_BYTES = 64 * 1024
+
+def iter_ndjson_records(resp):
+    for line in resp.iter_lines(chunk_size=NDJSON_READ_CHUNK_BYTES):
+        if line.strip():
+            yield json.loads(line)
+
+def parse_timestamp_columns(df):
+    import pandas as pd
+    for col in df.columns:
+        name = col.split('.')[-1].lower()
+        is_text = df[col].dtype == object or isinstance(df[col].dtype, pd.StringDtype)
+        if is_text and (name == 't' or 'time' in name):
+            parsed = pd.to_datetime(df[col], errors='coerce', utc=True)
+            if parsed.notna().any():
+                df[col] = parsed
+    return df
+
+# Parses an NDJSON /media response line by line as it arrives and flattens the records in
+# batches (nested fields such as ROIs become dotted columns), concatenating once at the end.
+def read_ndjson_frame(resp, progress_slot=None, batch_size=NDJSON_BATCH_SIZE):
+    import pandas as pd
+    frames = []
+    batch = []
+    raw_preview = []
+    count = 0
+    for record in iter_ndjson_records(resp):
+        count += 1
+        if len(raw_preview) < RAW_PREVIEW_RECORDS:
+            raw_preview.append(record)
+        batch.append(record)
+        if len(batch) >= batch_size:
+            frames.append(pd.json_normalize(batch))
+            batch = []
+            if progress_slot is not None:
+                progress_slot.caption(f"Parsed {count} metadata records...")
+    if batch:
+        frames.append(pd.json_normalize(batch))
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return parse_timestamp_columns(df), raw_preview
+
+def show_ndjson_media(url, params):
+    resp = logged_request("get", url, params=params, stream=True)
+    with resp:
+        resp.raise_for_status()
+        progress_slot = st.empty()
+        df, raw_preview = read_ndjson_frame(resp, progress_slot)
+        progress_slot.empty()
+    if df.empty:
+        st.info("No metadata records returned.")
+        return
+    st.caption(f"{len(df)} metadata records")
+    st.dataframe(df, use_container_width=True)
+    with st.expander(f"Raw records (first {len(raw_preview)})"):
+        st.json(raw_preview)
@@ -0,0 +1,22 @@
+import streamlit as st
+
+PAGE_SIZE_OPTIONS = [5, 10, 20, 50, 100]
+
+# Draws page controls for a list of `total` items and returns the (start, end) slice to render,
+# so only the visible window is sent to the browser while everything loaded stays in memory.
+def paginate(total, key, default_page_size=10):
+    cols = st.columns([1, 1, 3])
+    page_size = cols[0].selectbox(
+        "Items per page",
+        PAGE_SIZE_OPTIONS,
+        index=PAGE_SIZE_OPTIONS.index(default_page_size),
+        key=f"{key}_page_size"
+    )
+    page_count = max(1, (total + page_size - 1) // page_size)
+    if st.session_state.get(f"{key}_page", 1) > page_count:
+        st.session_state[f"{key}_page"] = page_count
+    page = cols[1].number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, key=f"{key}_page")
+    start = (page - 1) * page_size
+    end = min(start + page_size, total)
+    cols[2].caption(f"Showing {start + 1 if total else 0}-{end} of {total}")
+    return start, end
@@ -0,0 +1,187 @@
+import streamlit as st
+import json
+import sqlite3
+import threading
+import time
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from utils.api_logger import logged_request
+
+DEFAULT_REFERENCE_TTL = 300
+ERROR_RETRY_SECONDS = 30
+
+class ReferenceDataCache:
+    # Process-wide TTL cache for slow-changing lookups (servers, cameras, subtopics, descriptors).
+    # Expired entries are served stale while a background thread refreshes them; entries can
+    # optionally be persisted to a SQLite file so a restarted server starts warm.
+    def __init__(self, ttl, db_path=None):
+        self.ttl = ttl
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._refreshing = {}
+        if db_path:
+            with sqlite3.connect(db_path) as conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS reference_data (key TEXT PRIMARY KEY, value TEXT, expires_at REAL)")
+                for key, value, expires_at in conn.execute("SELECT key, value, expires_at FROM reference_data"):
+                    self._entries[key] = (json.loads(value), expires_at)
+
+    def peek(self, key, loader):
+        # Never blocks: returns None while the entry has not been loaded yet.
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if time.time() >= expires_at:
+            self._refresh_in_background(key, loader)
+        return value
+
+    def warm(self, lookups):
+        # Loads every missing (key, loader) pair on its own background thread.
+        for key, loader in lookups:
+            with self._lock:
+                if key in self._entries:
+                    continue
+            self._refresh_in_background(key, loader)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+        if self.db_path:
+            with sqlite3.connect(self.db_path) as conn:
+                if key is None:
+                    conn.execute("DELETE FROM reference_data")
+                else:
+                    conn.execute("DELETE FROM reference_data WHERE key = ?", (key,))
+
+    def _store(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+        if self.db_path:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO reference_data (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires_at)
+                )
+
+    def _load(self, key, loader):
+        try:
+            value = loader()
+        except Exception:
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None:
+                return entry[0]
+            # Remember the failure briefly so a down backend doesn't block every rerun.
+            with self._lock:
+                self._entries[key] = ([], time.time() + ERROR_RETRY_SECONDS)
+            return []
+        self._store(key, value, time.time() + self.ttl)
+        return value
+
+    def _refresh_in_background(self, key, loader):
+        def refresh():
+            try:
+                self._load(key, loader)
+            finally:
+                with self._lock:
+                    self._refreshing.pop(key, None)
+
+        thread = threading.Thread(target=refresh, daemon=True)
+        with self._lock:
+            if key in self._refreshing:
+                return None
+            self._refreshing[key] = thread
+        ctx = get_script_run_ctx()
+        if ctx is not None:
+            add_script_run_ctx(thread, ctx)
+        thread.start()
+        return thread
+
+    def is_refreshing(self):
+        with self._lock:
+            return bool(self._refreshing)
+
+@st.cache_resource
+def get_reference_cache():
+    ttl = float(st.secrets.get("REFERENCE_CACHE_TTL", DEFAULT_REFERENCE_TTL))
+    return ReferenceDataCache(ttl, st.secrets.get("REFERENCE_CACHE_DB") or None)
+
+def invalidate_reference_data():
+    get_reference_cache().invalidate()
+
+def fetch_result(url, extract):
+    resp = logged_request("get", url)
+    resp.raise_for_status()
+    return extract(resp.json())
+
+REFERENCE_LOOKUPS = {
+    'servers': lambda data: [(s.get("name"), s.get("id")) for s in data.get("result", {}).get("servers", [])],
+    'cameras': lambda data: [(c.get("name"), c.get("id")) for c in data.get("result", {}).get("cameras", [])],
+    'event-subtopics': lambda data: data.get("result", []),
+    'appearance-descriptions': lambda data: data['result']
+}
+WARMUP_TIMEOUT_SECONDS = 30
+WARMUP_POLL_SECONDS = 0.5
+
+def reference_lookup(api_url, name):
+    url = f"{api_url}/{name}"
+    return url, lambda: fetch_result(url, REFERENCE_LOOKUPS[name])
+
+def warm_reference_data(api_url):
+    # Starts every reference lookup in the background so pages can draw before the data arrives.
+    get_reference_cache().warm([reference_lookup(api_url, name) for name in REFERENCE_LOOKUPS])
+
+def get_reference_data(api_url, name):
+    # Returns the cached lookup, or None (after scheduling a background load) if it is not ready yet.
+    value = get_reference_cache().peek(*reference_lookup(api_url, name))
+    if value is None:
+        warm_reference_data(api_url)
+        st.session_state['_reference_pending'] = True
+    return value
+
+def get_servers(api_url):
+    return get_reference_data(api_url, 'servers')
+
+def get_cameras(api_url):
+    return get_reference_data(api_url, 'cameras')
+
+def get_event_subtopics(api_url):
+    return get_reference_data(api_url, 'event-subtopics')
+
+def get_appearance_descriptions(api_url):
+    return get_reference_data(api_url, 'appearance-descriptions')
+
+def with_placeholder(value, label):
+    if value is None:
+        st.sidebar.caption(f"⏳ Loading {label}...")
+        return []
+    return value
+
+def reference_data_watcher():
+    # Runs as a run_every fragment, so the script thread is free to handle widget clicks while
+    # the lookups load; reruns the page once they are done (or the wait times out).
+    started = st.session_state.get('_reference_wait_started', 0)
+    if get_reference_cache().is_refreshing() and time.time() - started < WARMUP_TIMEOUT_SECONDS:
+        return
+    st.session_state.pop('_reference_wait_started', None)
+    st.rerun()
+
+def await_reference_data():
+    # Called once the page has been drawn: if a lookup was still loading, poll for it so the
+    # sidebar placeholders fill in.
+    if not st.session_state.pop('_reference_pending', False):
+        st.session_state.pop('_reference_wait_started', None)
+        return
+    st.session_state.setdefault('_reference_wait_started', time.time())
+    st.fragment(reference_data_watcher, run_every=WARMUP_POLL_SECONDS)()
+
+def show_reference_data_controls():
+    st.sidebar.button(
+        "Refresh Reference Data",
+        help="Drop the cached servers, cameras, event subtopics and appearance descriptors for all sessions.",
+        on_click=invalidate_reference_data
+    )
@@ -1,6 +1,14 @@
 from utils.styles import apply_global_styles
 from utils.api_logger import show_api_logs
+from utils.governor import show_governor_status
+from utils.metrics import record_first_paint, record_page_render
+from utils.reference_data import show_reference_data_controls, await_reference_data
 
 def global_page_setup():
     apply_global_styles()
-    show_api_logs()
\ No newline at end of file
+    show_reference_data_controls()
+    show_governor_status()
+    show_api_logs()
+    record_first_paint()
+    await_reference_data()
+    record_page_render()
\ No newline at end of file